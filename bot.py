@@ -29,6 +29,7 @@ from pyrogram import Client as UserBotClient
 from lncrawl.core.app import App
 from lncrawl.core.sources import load_sources
 from lncrawl.core.arguments import get_args
+from lncrawl.utils.hostlimit import SharedHostLimiter, set_shared_limiter
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 logging.getLogger("pyrogram").setLevel(logging.WARNING)
@@ -42,6 +43,8 @@ TOKEN = os.getenv("TELEGRAM_TOKEN")
 # [SPEED OPTIMIZATION]
 THREADS_PER_NOVEL = 60
 MAX_CONCURRENT_NOVELS = 10
+# Requests in flight per host across ALL worker processes
+MAX_REQUESTS_PER_HOST = int(os.getenv("MAX_REQUESTS_PER_HOST", "60"))
 
 # Group Configs (Must be -100xxxx format)
 TARGET_GROUP_ID = os.getenv("TARGET_GROUP_ID") 
@@ -70,7 +73,8 @@ logger = logging.getLogger(__name__)
 pending_uploads = {}
 
 # --- WORKER INITIALIZER ---
-def worker_initializer():
+def worker_initializer(host_limiter=None):
+    set_shared_limiter(host_limiter)
     load_sources()
     args = get_args()
     args.suppress = True
@@ -156,9 +160,11 @@ def scrape_logic_worker(url, progress_queue):
 
 class NovelBot:
     def __init__(self):
+        self.host_limiter = SharedHostLimiter(MAX_REQUESTS_PER_HOST)
         self.executor = ProcessPoolExecutor(
             max_workers=MAX_CONCURRENT_NOVELS,
-            initializer=worker_initializer
+            initializer=worker_initializer,
+            initargs=(self.host_limiter,)
         )
         self.manager = multiprocessing.Manager()
         self.userbot = None
@@ -377,7 +383,11 @@ class NovelBot:
         app.run_polling()
 
     async def cmd_start(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        await update.message.reply_text(f"⚡ **FanMTL Bot (Turbo)** ⚡\nProcessed: {len(self.processed)}\nUser: {self.bot_username}")
+        hosts = "\n".join(
+            f"• {host}: {used}/{self.host_limiter.limit}"
+            for host, used in self.host_limiter.usage().items() if used
+        )
+        await update.message.reply_text(f"⚡ **FanMTL Bot (Turbo)** ⚡\nProcessed: {len(self.processed)}\nUser: {self.bot_username}\nActive hosts:\n{hosts or '• none'}")
 
     async def cmd_reset(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         self.processed = set()
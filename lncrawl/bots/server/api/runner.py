@@ -1,5 +1,7 @@
 from fastapi import APIRouter, Depends
 
+from lncrawl.utils.metrics import request_metrics
+
 from ..context import ServerContext
 from ..models.job import JobRunnerHistory
 
@@ -17,6 +19,7 @@ def history(ctx: ServerContext = Depends()) -> JobRunnerHistory:
     return JobRunnerHistory(
         running=ctx.scheduler.running,
         history=list(reversed(ctx.scheduler.history)),
+        metrics=request_metrics.summary(),
     )
 
 
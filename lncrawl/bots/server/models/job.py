@@ -65,3 +65,4 @@ class JobRunnerHistoryItem(BaseModel):
 class JobRunnerHistory(BaseModel):
     running: bool = Field(description='Job runner status')
     history: List[JobRunnerHistoryItem] = Field(description='Runner history')
+    metrics: Dict[str, Any] = Field(default={}, description='Request metrics of this process by host')
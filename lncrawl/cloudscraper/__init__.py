@@ -1,11 +1,13 @@
 # ------------------------------------------------------------------------------- #
 
 import copyreg
+import itertools
 import logging
+import re
 import ssl
 import sys
 import time
-from threading import Event
+from threading import Condition, Event, local
 from typing import Any
 from urllib.parse import urlparse
 
@@ -15,6 +17,7 @@ from requests.adapters import HTTPAdapter
 from requests.sessions import Session
 from requests_toolbelt.utils import dump
 
+from .clearance import CLEARANCE_COOKIES, get_clearance_store
 from .cloudflare import Cloudflare
 from .cloudflare_v2 import CloudflareV2
 from .cloudflare_v3 import CloudflareV3
@@ -23,7 +26,7 @@ from .exceptions import (AbortedException, CloudflareIUAMError,
 from .proxy_manager import ProxyManager
 from .stealth import StealthMode
 from .turnstile import CloudflareTurnstile
-from .user_agent import User_Agent
+from .user_agent import User_Agent, load_user_agents
 
 # ------------------------------------------------------------------------------- #
 
@@ -31,6 +34,16 @@ __version__ = '3.0.0'
 
 # ------------------------------------------------------------------------------- #
 
+# Every challenge detector requires one of these status codes
+CHALLENGE_STATUS_CODES = (403, 429, 503)
+
+# Every challenge detector requires one of these markers in the body
+CHALLENGE_MARKERS = re.compile(
+    r'/cdn-cgi/|_cf_chl_|cf-turnstile|challenges\.cloudflare\.com|data-sitekey=|cf-error-code'
+)
+
+# ------------------------------------------------------------------------------- #
+
 
 class CipherSuiteAdapter(HTTPAdapter):
 
@@ -124,6 +137,13 @@ class CloudScraper(Session):
         self.requestPreHook = kwargs.pop('requestPreHook', None)
         self.requestPostHook = kwargs.pop('requestPostHook', None)
 
+        # Clearance store shared with other scrapers and processes
+        self.clearance_store = kwargs.pop('clearance_store', None)
+        if isinstance(self.clearance_store, str):
+            self.clearance_store = get_clearance_store(self.clearance_store)
+        self._clearance_checked = {}
+        self._clearance_saved = {}
+
         # TLS/SSL options
         self.cipherSuite = kwargs.pop('cipherSuite', None)
         self.ecdhCurve = kwargs.pop('ecdhCurve', 'prime256v1')
@@ -162,16 +182,26 @@ class CloudScraper(Session):
         self.last_request_time = 0.0
         self.min_request_interval = kwargs.pop('min_request_interval', 1.0)  # Minimum 1 second between requests
         self.max_concurrent_requests = kwargs.pop('max_concurrent_requests', 1)  # Limit concurrent requests
-        self.current_concurrent_requests = 0
+        self._request_slots = Condition()
+        self._request_local = local()
+        self._inflight_requests = 0
+        self._queued_requests = 0
         self.rotate_tls_ciphers = kwargs.pop('rotate_tls_ciphers', True)  # Enable TLS cipher rotation
-        self._cipher_rotation_count = 0
+        self.tls_cipher_variants = kwargs.pop('tls_cipher_variants', 4)  # Number of pooled cipher suite adapters
+        self._cipher_rotation = itertools.count()
+        self._cipher_adapters = []
+
+        # Connection pool sizes of the mounted adapters
+        self.pool_connections = kwargs.pop('pool_connections', requests.adapters.DEFAULT_POOLSIZE)
+        self.pool_maxsize = kwargs.pop('pool_maxsize', requests.adapters.DEFAULT_POOLSIZE)
 
         # Proxy management
         proxy_options = kwargs.pop('proxy_options', {})
         self.proxy_manager = ProxyManager(
             proxies=kwargs.pop('rotating_proxies', None),
             proxy_rotation_strategy=proxy_options.get('rotation_strategy', 'sequential'),
-            ban_time=proxy_options.get('ban_time', 300)
+            ban_time=proxy_options.get('ban_time', 300),
+            exploration=proxy_options.get('exploration', 0.05)
         )
 
         # Stealth mode
@@ -204,14 +234,16 @@ class CloudScraper(Session):
             self.cipherSuite = ':'.join(self.cipherSuite)
 
         # Mount the HTTPS adapter with our custom cipher suite
+        self._cipher_adapters = [
+            self._create_cipher_adapter(cipher_suite)
+            for cipher_suite in self._cipher_suite_variants()
+        ]
+        self.mount('https://', self._cipher_adapters[0])
         self.mount(
-            'https://',
-            CipherSuiteAdapter(
-                cipherSuite=self.cipherSuite,
-                ecdhCurve=self.ecdhCurve,
-                server_hostname=self.server_hostname,
-                source_address=self.source_address,
-                ssl_context=self.ssl_context
+            'http://',
+            HTTPAdapter(
+                pool_connections=self.pool_connections,
+                pool_maxsize=self.pool_maxsize
             )
         )
 
@@ -277,18 +309,40 @@ class CloudScraper(Session):
 
         return resp
 
+    # ------------------------------------------------------------------------------- #
+    # Cheap check of whether any challenge detector could match the response,
+    # so that ordinary pages are never decoded and scanned by them
+    # ------------------------------------------------------------------------------- #
+
+    @staticmethod
+    def is_Challenge_Candidate(resp):
+        if resp.status_code not in CHALLENGE_STATUS_CODES:
+            return False
+
+        if not (
+            resp.headers.get('Server', '').startswith('cloudflare')
+            or 'cf-mitigated' in resp.headers
+        ):
+            return False
+
+        try:
+            return CHALLENGE_MARKERS.search(resp.text) is not None
+        except (AttributeError, TypeError):
+            return False
+
     # ------------------------------------------------------------------------------- #
     # Our hijacker request function
     # ------------------------------------------------------------------------------- #
 
     def request(self, method, url, *args, **kwargs):
+        hostname = urlparse(url).hostname
         try:
             # Apply request throttling to prevent TLS blocking
             self._apply_request_throttling()
 
-            # Rotate TLS cipher suites to avoid detection
-            if self.rotate_tls_ciphers:
-                self._rotate_tls_cipher_suite()
+            # Reuse a clearance earned by another scraper
+            if self._request_local.depth == 1:
+                self._load_clearance(hostname)
 
             # Check if session needs refresh due to age
             if self._should_refresh_session():
@@ -307,9 +361,6 @@ class CloudScraper(Session):
             # Track request count
             self.request_count += 1
 
-            # Track concurrent requests
-            self.current_concurrent_requests += 1
-
             # ------------------------------------------------------------------------------- #
             # Pre-Hook the request via user defined function.
             # ------------------------------------------------------------------------------- #
@@ -334,21 +385,15 @@ class CloudScraper(Session):
 
                 # Report successful proxy use if applicable
                 if kwargs.get('proxies') and hasattr(self, 'proxy_manager'):
-                    self.proxy_manager.report_success(kwargs['proxies'])
+                    self.proxy_manager.report_success(
+                        kwargs['proxies'],
+                        latency=response.elapsed.total_seconds()
+                    )
 
             except (requests.exceptions.ProxyError, requests.exceptions.ConnectionError) as e:
                 # Report failed proxy use if applicable
                 if kwargs.get('proxies') and hasattr(self, 'proxy_manager'):
                     self.proxy_manager.report_failure(kwargs['proxies'])
-
-                # CRITICAL FIX: Always decrement concurrent request counter on exception
-                if self.current_concurrent_requests > 0:
-                    self.current_concurrent_requests -= 1
-                raise e
-            except Exception as e:
-                # CRITICAL FIX: Always decrement concurrent request counter on any exception
-                if self.current_concurrent_requests > 0:
-                    self.current_concurrent_requests -= 1
                 raise e
 
             # ------------------------------------------------------------------------------- #
@@ -383,48 +428,50 @@ class CloudScraper(Session):
                     f"!!Loop Protection!! We have tried to solve {_} time(s) in a row."
                 )
 
-            # Check for Cloudflare Turnstile challenges first (if not disabled)
-            if not self.disableTurnstile:
-                # Check for Turnstile Challenge
-                if self.turnstile.is_Turnstile_Challenge(response):
-                    if self.debug:
-                        print('Detected a Cloudflare Turnstile challenge.')
-                    self._solveDepthCnt += 1
-                    response = self.turnstile.handle_Turnstile_Challenge(response, **kwargs)
-                    return response
-
-            # Check for Cloudflare v3 challenges (if not disabled)
-            if not self.disableCloudflareV3:
-                # Check for v3 JavaScript VM Challenge
-                if self.cloudflare_v3.is_V3_Challenge(response):
-                    if self.debug:
-                        print('Detected a Cloudflare v3 JavaScript VM challenge.')
-                    self._solveDepthCnt += 1
-                    response = self.cloudflare_v3.handle_V3_Challenge(response, **kwargs)
-                    return response
-
-            # Check for Cloudflare v2 challenges (if not disabled)
-            if not self.disableCloudflareV2:
-                # Check for v2 Captcha Challenge
-                if self.cloudflare_v2.is_V2_Captcha_Challenge(response):
-                    self._solveDepthCnt += 1
-                    response = self.cloudflare_v2.handle_V2_Captcha_Challenge(response, **kwargs)
-                    return response
-
-                # Check for v2 JavaScript Challenge
-                if self.cloudflare_v2.is_V2_Challenge(response):
-                    self._solveDepthCnt += 1
-                    response = self.cloudflare_v2.handle_V2_Challenge(response, **kwargs)
-                    return response
-
-            # Check for Cloudflare v1 challenges (if not disabled)
-            if not self.disableCloudflareV1:
-                # Check if Cloudflare v1 anti-bot is on
-                if self.cloudflare_v1.is_Challenge_Request(response):
-                    # Try to solve the challenge and send it back
-                    self._solveDepthCnt += 1
-                    response = self.cloudflare_v1.Challenge_Response(response, **kwargs)
-                    return response
+            # Only run the detectors on responses that may be a challenge
+            if self.is_Challenge_Candidate(response):
+                # Check for Cloudflare Turnstile challenges first (if not disabled)
+                if not self.disableTurnstile:
+                    # Check for Turnstile Challenge
+                    if self.turnstile.is_Turnstile_Challenge(response):
+                        if self.debug:
+                            print('Detected a Cloudflare Turnstile challenge.')
+                        self._solveDepthCnt += 1
+                        response = self.turnstile.handle_Turnstile_Challenge(response, **kwargs)
+                        return response
+
+                # Check for Cloudflare v3 challenges (if not disabled)
+                if not self.disableCloudflareV3:
+                    # Check for v3 JavaScript VM Challenge
+                    if self.cloudflare_v3.is_V3_Challenge(response):
+                        if self.debug:
+                            print('Detected a Cloudflare v3 JavaScript VM challenge.')
+                        self._solveDepthCnt += 1
+                        response = self.cloudflare_v3.handle_V3_Challenge(response, **kwargs)
+                        return response
+
+                # Check for Cloudflare v2 challenges (if not disabled)
+                if not self.disableCloudflareV2:
+                    # Check for v2 Captcha Challenge
+                    if self.cloudflare_v2.is_V2_Captcha_Challenge(response):
+                        self._solveDepthCnt += 1
+                        response = self.cloudflare_v2.handle_V2_Captcha_Challenge(response, **kwargs)
+                        return response
+
+                    # Check for v2 JavaScript Challenge
+                    if self.cloudflare_v2.is_V2_Challenge(response):
+                        self._solveDepthCnt += 1
+                        response = self.cloudflare_v2.handle_V2_Challenge(response, **kwargs)
+                        return response
+
+                # Check for Cloudflare v1 challenges (if not disabled)
+                if not self.disableCloudflareV1:
+                    # Check if Cloudflare v1 anti-bot is on
+                    if self.cloudflare_v1.is_Challenge_Request(response):
+                        # Try to solve the challenge and send it back
+                        self._solveDepthCnt += 1
+                        response = self.cloudflare_v1.Challenge_Response(response, **kwargs)
+                        return response
 
             # Reset solve depth counter if no challenge was detected
             if not response.is_redirect and response.status_code not in [429, 503]:
@@ -433,12 +480,17 @@ class CloudScraper(Session):
             # Handle 403 errors with automatic session refresh
             if response.status_code == 403:
                 self.last_403_time = time.time()
+                if response.headers.get('Server', '').startswith('cloudflare'):
+                    self._invalidate_clearance(hostname)
 
             return response
         finally:
-            # Decrement concurrent request counter
-            if self.current_concurrent_requests > 0:
-                self.current_concurrent_requests -= 1
+            # Share a newly earned clearance
+            if self._request_local.depth == 1:
+                self._save_clearance(hostname)
+
+            # Give back the concurrent request slot
+            self._release_request_slot()
 
     # ------------------------------------------------------------------------------- #
     # Session health monitoring and refresh methods
@@ -481,9 +533,11 @@ class CloudScraper(Session):
                 self.user_agent.loadUserAgent()
                 self.headers.update(self.user_agent.headers)  # type:ignore
 
+            # Restore a clearance that is still valid, instead of solving again
+            self._load_clearance(urlparse(url).hostname, force=True)
+
             # Make a simple request to re-establish session
             try:
-                from urllib.parse import urlparse
                 parsed_url = urlparse(url)
                 base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
 
@@ -530,87 +584,239 @@ class CloudScraper(Session):
         if self.debug:
             print('Cleared Cloudflare cookies for session refresh')
 
+    # ------------------------------------------------------------------------------- #
+    # Clearance sharing via the clearance store
+    # ------------------------------------------------------------------------------- #
+
+    def _find_clearance(self, hostname):
+        """
+        Returns the cf_clearance cookie of the session for the host, if any
+        """
+        try:
+            for cookie in list(self.cookies):
+                if cookie.name != 'cf_clearance':
+                    continue
+                domain = cookie.domain.lstrip('.')
+                if hostname == domain or hostname.endswith('.' + domain):
+                    return cookie
+        except RuntimeError:
+            pass  # the jar was modified by another thread
+        return None
+
+    def _load_clearance(self, hostname, force=False):
+        """
+        Load a valid clearance of the host from the store into the session.
+        A clearance is bound to a user agent, so the user agent is adopted too.
+        """
+        if not self.clearance_store or not hostname:
+            return
+        if not force:
+            if self._find_clearance(hostname):
+                return
+            if time.time() - self._clearance_checked.get(hostname, 0) < 30:
+                return
+        self._clearance_checked[hostname] = time.time()
+
+        user_agent = self.headers.get('User-Agent')
+        entry = self.clearance_store.get(hostname, user_agent) or self.clearance_store.get(hostname)
+        if not entry:
+            return
+
+        user_agent, cookies = entry
+        self.headers['User-Agent'] = user_agent
+        for cookie in cookies:
+            self.cookies.set(
+                cookie['name'],
+                cookie['value'],
+                domain=cookie.get('domain') or '',
+                path=cookie.get('path') or '/'
+            )
+            if cookie['name'] == 'cf_clearance':
+                self._clearance_saved[hostname] = cookie['value']
+
+        if self.debug:
+            print(f'🍪 Reusing stored Cloudflare clearance for {hostname}')
+
+    def _save_clearance(self, hostname):
+        """
+        Save the clearance of the host to the store, if it is a new one
+        """
+        if not self.clearance_store or not hostname:
+            return
+        try:
+            clearance = self._find_clearance(hostname)
+            if not clearance or self._clearance_saved.get(hostname) == clearance.value:
+                return
+            self._clearance_saved[hostname] = clearance.value
+
+            cookies = [
+                {
+                    'name': cookie.name,
+                    'value': cookie.value,
+                    'domain': cookie.domain,
+                    'path': cookie.path,
+                    'expires': cookie.expires,
+                }
+                for cookie in list(self.cookies)
+                if cookie.name in CLEARANCE_COOKIES and cookie.domain == clearance.domain
+            ]
+            self.clearance_store.put(hostname, self.headers.get('User-Agent'), cookies)
+        except Exception as e:
+            if self.debug:
+                print(f'⚠️ Failed to save clearance: {e}')
+
+    def _invalidate_clearance(self, hostname):
+        """
+        Drop the clearance of the host from the store, after Cloudflare rejected it
+        """
+        if not self.clearance_store or not hostname:
+            return
+        clearance = self._find_clearance(hostname)
+        if clearance:
+            self.clearance_store.invalidate(hostname, clearance.value)
+            # keep the rejected value from being saved again
+            self._clearance_saved[hostname] = clearance.value
+        self._clearance_checked.pop(hostname, None)
+
+    # ------------------------------------------------------------------------------- #
+
+    @property
+    def inflight_requests(self):
+        """
+        Number of requests currently holding a concurrent request slot
+        """
+        return self._inflight_requests
+
+    @property
+    def queued_requests(self):
+        """
+        Number of requests waiting for a concurrent request slot
+        """
+        return self._queued_requests
+
+    @property
+    def current_concurrent_requests(self):
+        return self._inflight_requests
+
+    @property
+    def throttle_wait(self):
+        """
+        Seconds the last request of the current thread waited for a slot
+        and for the minimum request interval
+        """
+        return getattr(self._request_local, 'throttle_wait', 0.0)
+
     def _apply_request_throttling(self):
         """
-        Apply request throttling to prevent TLS blocking from concurrent requests
+        Apply request throttling to prevent TLS blocking from concurrent requests.
+
+        Takes a concurrent request slot, waiting on a condition until one is
+        released. Nested requests of the same thread (e.g. challenge solving)
+        reuse the slot of the outer request. Must be paired with
+        _release_request_slot, even when this raises.
         """
-        current_time = time.time()
+        depth = getattr(self._request_local, 'depth', 0)
+        self._request_local.depth = depth + 1
+        if depth > 0:
+            return
+
+        started = time.time()
+        self._request_local.throttle_wait = 0.0
+        with self._request_slots:
+            # Wait if too many concurrent requests
+            if self.max_concurrent_requests and self._inflight_requests >= self.max_concurrent_requests:
+                if self.debug:
+                    print(f'🚦 Concurrent request limit reached ({self._inflight_requests}/{self.max_concurrent_requests}), waiting...')
+                self._queued_requests += 1
+                try:
+                    while self._inflight_requests >= self.max_concurrent_requests:
+                        if self.signal.is_set():
+                            raise AbortedException()
+                        self._request_slots.wait(1)
+                finally:
+                    self._queued_requests -= 1
+            self._inflight_requests += 1
+            self._request_local.holding = True
+
+            # Reserve the next send time, so waiting threads are spaced apart
+            current_time = time.time()
+            send_time = max(current_time, self.last_request_time + self.min_request_interval)
+            self.last_request_time = send_time
 
         # Wait for minimum interval between requests
-        time_since_last_request = current_time - self.last_request_time
-        if time_since_last_request < self.min_request_interval:
-            sleep_time = self.min_request_interval - time_since_last_request
+        sleep_time = send_time - current_time
+        if sleep_time > 0:
             if self.debug:
                 print(f'⏱️ Request throttling: sleeping {sleep_time:.2f}s')
-            time.sleep(sleep_time)
-            if self.signal.is_set():
+            if self.signal.wait(sleep_time):
                 raise AbortedException()
 
-        # Wait if too many concurrent requests
-        while self.current_concurrent_requests >= self.max_concurrent_requests:
-            if self.debug:
-                print(f'🚦 Concurrent request limit reached ({self.current_concurrent_requests}/{self.max_concurrent_requests}), waiting...')
-            time.sleep(0.1)
-            if self.signal.is_set():
-                raise AbortedException()
+        self._request_local.throttle_wait = time.time() - started
+
+    def _release_request_slot(self):
+        depth = getattr(self._request_local, 'depth', 0) - 1
+        self._request_local.depth = max(0, depth)
+        if depth > 0 or not getattr(self._request_local, 'holding', False):
+            return
 
-        self.last_request_time = time.time()
+        self._request_local.holding = False
+        with self._request_slots:
+            self._inflight_requests -= 1
+            self._request_slots.notify()
 
-    def _rotate_tls_cipher_suite(self):
+    def _cipher_suite_variants(self):
         """
-        Rotate TLS cipher suites to avoid detection patterns
+        Build the cipher suites to rotate among: the primary suite first,
+        followed by windows of up to 8 ciphers of the current browser
         """
-        if not hasattr(self, 'user_agent') or not hasattr(self.user_agent, 'cipherSuite'):
-            return
-
-        # Get available cipher suites for current browser
-        browser_name = getattr(self.user_agent, 'browser', 'chrome')
+        variants = [self.cipherSuite]
+        if not self.rotate_tls_ciphers or self.ssl_context or self.tls_cipher_variants < 2:
+            return variants
+
+        browser_name = getattr(self.user_agent, 'browser', None) or 'chrome'
+        available_ciphers = load_user_agents()['cipherSuite'].get(browser_name, ())
+        if len(available_ciphers) < 2:
+            return variants
+
+        num_ciphers = min(8, len(available_ciphers))
+        positions = len(available_ciphers) - num_ciphers + 1
+        count = min(self.tls_cipher_variants - 1, positions)
+        for i in range(count):
+            start_index = (i * positions) // count
+            cipher_suite = ':'.join(available_ciphers[start_index:start_index + num_ciphers])
+            if cipher_suite not in variants:
+                variants.append(cipher_suite)
+        return variants
+
+    def _create_cipher_adapter(self, cipher_suite):
+        return CipherSuiteAdapter(
+            cipherSuite=cipher_suite,
+            ecdhCurve=self.ecdhCurve,
+            server_hostname=self.server_hostname,
+            source_address=self.source_address,
+            ssl_context=self.ssl_context,
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize
+        )
 
-        try:
-            # Get cipher suites from browsers.json
-            import json
-            import os
-            browsers_file = os.path.join(os.path.dirname(__file__), 'user_agent', 'browsers.json')
-
-            with open(browsers_file, 'r') as f:
-                browsers_data = json.load(f)
-
-            available_ciphers = browsers_data.get('cipherSuite', {}).get(browser_name, [])
-
-            if available_ciphers and len(available_ciphers) > 1:
-                # Rotate through cipher suites
-                self._cipher_rotation_count += 1
-                cipher_index = self._cipher_rotation_count % len(available_ciphers)
-
-                # Use a subset of ciphers to create variation
-                num_ciphers = min(8, len(available_ciphers))  # Use up to 8 ciphers
-                start_index = cipher_index % (len(available_ciphers) - num_ciphers + 1)
-                selected_ciphers = available_ciphers[start_index:start_index + num_ciphers]
-
-                new_cipher_suite = ':'.join(selected_ciphers)
-
-                if new_cipher_suite != self.cipherSuite:
-                    self.cipherSuite = new_cipher_suite
-
-                    # Update the HTTPS adapter with new cipher suite
-                    self.mount(
-                        'https://',
-                        CipherSuiteAdapter(
-                            cipherSuite=self.cipherSuite,
-                            ecdhCurve=self.ecdhCurve,
-                            server_hostname=self.server_hostname,
-                            source_address=self.source_address,
-                            ssl_context=self.ssl_context
-                        )
-                    )
+    def get_adapter(self, url):
+        """
+        Rotate TLS cipher suites to avoid detection patterns.
 
-                    if self.debug:
-                        print(f'🔐 Rotated TLS cipher suite (rotation #{self._cipher_rotation_count})')
-                        print(f'    Using {len(selected_ciphers)} ciphers starting from index {start_index}')
+        Each cipher suite has its own adapter built up front, so every
+        variant keeps a warm connection pool. Rotation only happens while
+        our primary adapter is mounted; an adapter mounted by the caller wins.
+        """
+        adapter = super(CloudScraper, self).get_adapter(url)
+        adapters = self._cipher_adapters
+        if self.rotate_tls_ciphers and len(adapters) > 1 and adapter is adapters[0]:
+            adapter = adapters[next(self._cipher_rotation) % len(adapters)]
+        return adapter
 
-        except Exception as e:
-            if self.debug:
-                print(f'⚠️ TLS cipher rotation failed: {e}')
+    def close(self):
+        super(CloudScraper, self).close()
+        for adapter in self._cipher_adapters:
+            adapter.close()
 
     # ------------------------------------------------------------------------------- #
 
@@ -624,6 +830,7 @@ class CloudScraper(Session):
         - proxy_options: Dict with proxy configuration options
             - rotation_strategy: Strategy for rotating proxies ('sequential', 'random', or 'smart')
             - ban_time: Time in seconds to ban a proxy after a failure
+            - exploration: Share of 'smart' picks made uniformly at random (default: 0.05)
         - enable_stealth: Whether to enable stealth mode (default: True)
         - stealth_options: Dict with stealth mode configuration options
             - min_delay: Minimum delay between requests in seconds
@@ -637,6 +844,9 @@ class CloudScraper(Session):
         - min_request_interval: Minimum time in seconds between requests (default: 1.0)
         - max_concurrent_requests: Maximum number of concurrent requests (default: 1)
         - rotate_tls_ciphers: Whether to rotate TLS cipher suites to avoid detection (default: True)
+        - tls_cipher_variants: Number of cipher suite adapters to rotate among, each with its own pool (default: 4)
+        - pool_connections: Number of connection pools to cache per adapter (default: 10)
+        - pool_maxsize: Maximum number of connections to keep per pool (default: 10)
         - disableCloudflareV3: Whether to disable Cloudflare v3 JavaScript VM challenge handling (default: False)
         - disableTurnstile: Whether to disable Cloudflare Turnstile challenge handling (default: False)
         """
@@ -0,0 +1,152 @@
+import json
+import logging
+import os
+import sqlite3
+import time
+from threading import Lock, local
+
+# ------------------------------------------------------------------------------- #
+
+logger = logging.getLogger(__name__)
+
+# Cookies that make up a Cloudflare clearance
+CLEARANCE_COOKIES = ['cf_clearance', '__cf_bm', 'cf_chl_2', 'cf_chl_prog', 'cf_chl_rc_ni', 'cf_turnstile']
+
+# ------------------------------------------------------------------------------- #
+
+
+class ClearanceStore():
+    """
+    A small SQLite store of Cloudflare clearance cookies keyed by host and user agent.
+
+    The database is opened in WAL mode with a busy timeout, so any number of
+    threads and processes can share a single file. Entries expire after `ttl`
+    seconds, or earlier if the clearance cookie itself expires.
+    """
+
+    def __init__(self, path, ttl=1800, busy_timeout=5.0):
+        self.path = path
+        self.ttl = ttl
+        self.busy_timeout = busy_timeout
+        self._local = local()
+
+        folder = os.path.dirname(os.path.abspath(path))
+        os.makedirs(folder, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS clearance ('
+                'host TEXT NOT NULL, '
+                'user_agent TEXT NOT NULL, '
+                'cookies TEXT NOT NULL, '
+                'expires REAL NOT NULL, '
+                'PRIMARY KEY (host, user_agent))'
+            )
+
+    # ------------------------------------------------------------------------------- #
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        # a connection must not be shared with a forked child process
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout * 1000)}')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    # ------------------------------------------------------------------------------- #
+
+    def get(self, host, user_agent=None):
+        """
+        Returns (user_agent, cookies) of a valid clearance for the host, or None.
+        Without a user_agent, the most recent clearance of the host is returned.
+        """
+        try:
+            if user_agent:
+                row = self._connect().execute(
+                    'SELECT user_agent, cookies FROM clearance '
+                    'WHERE host = ? AND user_agent = ? AND expires > ?',
+                    (host, user_agent, time.time())
+                ).fetchone()
+            else:
+                row = self._connect().execute(
+                    'SELECT user_agent, cookies FROM clearance '
+                    'WHERE host = ? AND expires > ? ORDER BY expires DESC LIMIT 1',
+                    (host, time.time())
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.debug(f'Failed to read clearance of {host}: {e}')
+            return None
+
+        if not row:
+            return None
+        return row[0], json.loads(row[1])
+
+    # ------------------------------------------------------------------------------- #
+
+    def put(self, host, user_agent, cookies, ttl=None):
+        """
+        Saves clearance cookies for the host and user agent.
+        Each cookie is a dict of name, value, domain, path and expires.
+        """
+        expires = time.time() + (ttl or self.ttl)
+        for cookie in cookies:
+            if cookie.get('name') == 'cf_clearance' and cookie.get('expires'):
+                expires = min(expires, float(cookie['expires']))
+
+        try:
+            self._connect().execute(
+                'INSERT OR REPLACE INTO clearance (host, user_agent, cookies, expires) '
+                'VALUES (?, ?, ?, ?)',
+                (host, user_agent, json.dumps(cookies), expires)
+            )
+            self._connect().execute('DELETE FROM clearance WHERE expires <= ?', (time.time(),))
+        except sqlite3.Error as e:
+            logger.debug(f'Failed to save clearance of {host}: {e}')
+
+    # ------------------------------------------------------------------------------- #
+
+    def invalidate(self, host, clearance=None):
+        """
+        Removes the clearance of the host. If the clearance value is given, only
+        the entries holding that value are removed, so a fresh clearance saved by
+        another process in the meantime is kept.
+        """
+        try:
+            rows = self._connect().execute(
+                'SELECT user_agent, cookies FROM clearance WHERE host = ?',
+                (host,)
+            ).fetchall()
+            for user_agent, cookies in rows:
+                if clearance and clearance not in [
+                    c.get('value') for c in json.loads(cookies) if c.get('name') == 'cf_clearance'
+                ]:
+                    continue
+                self._connect().execute(
+                    'DELETE FROM clearance WHERE host = ? AND user_agent = ?',
+                    (host, user_agent)
+                )
+        except sqlite3.Error as e:
+            logger.debug(f'Failed to invalidate clearance of {host}: {e}')
+
+# ------------------------------------------------------------------------------- #
+
+
+_stores = {}
+_stores_lock = Lock()
+
+
+def get_clearance_store(path, ttl=1800):
+    """
+    Returns the shared ClearanceStore of the path, or None if it can not be opened
+    """
+    path = os.path.abspath(path)
+    with _stores_lock:
+        if path not in _stores:
+            try:
+                _stores[path] = ClearanceStore(path, ttl=ttl)
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f'Clearance store is not available at {path}: {e}')
+                _stores[path] = None
+        return _stores[path]
@@ -1,7 +1,86 @@
+import heapq
 import random
 import logging
 import time
 from collections import defaultdict
+from threading import Lock
+
+# ------------------------------------------------------------------------------- #
+
+# Latency assumed for a proxy that has not been measured yet
+DEFAULT_LATENCY = 1.0
+
+# ------------------------------------------------------------------------------- #
+
+
+class _WeightTree:
+    """
+    A Fenwick tree of weights, to sample an index proportionally to its
+    weight and to change a weight in O(log n)
+    """
+
+    def __init__(self):
+        self.values = []
+        self.tree = [0.0]
+
+    def __len__(self):
+        return len(self.values)
+
+    def _prefix(self, j):
+        total = 0.0
+        while j > 0:
+            total += self.tree[j]
+            j -= j & -j
+        return total
+
+    def append(self, value):
+        j = len(self.values) + 1
+        # the new node covers a range of existing values
+        self.tree.append(self._prefix(j - 1) - self._prefix(j - (j & -j)))
+        self.values.append(0.0)
+        self.update(j - 1, value)
+
+    def pop(self):
+        # no other node covers the last index
+        self.tree.pop()
+        return self.values.pop()
+
+    def update(self, i, value):
+        delta = value - self.values[i]
+        self.values[i] = value
+        j = i + 1
+        while j < len(self.tree):
+            self.tree[j] += delta
+            j += j & -j
+
+    def total(self):
+        return self._prefix(len(self.values))
+
+    def sample(self):
+        """
+        Returns a random index with probability proportional to its weight,
+        or None if all weights are zero
+        """
+        total = self.total()
+        if total <= 0:
+            return None
+        target = random.random() * total
+        pos = 0
+        step = 1 << len(self.values).bit_length()
+        while step:
+            nxt = pos + step
+            if nxt < len(self.tree) and self.tree[nxt] <= target:
+                pos = nxt
+                target -= self.tree[nxt]
+            step >>= 1
+        # skip zero weights left behind by rounding errors
+        for i in range(pos, len(self.values)):
+            if self.values[i] > 0:
+                return i
+        for i in range(pos - 1, -1, -1):
+            if self.values[i] > 0:
+                return i
+        return None
 
 # ------------------------------------------------------------------------------- #
 
@@ -11,75 +90,153 @@ class ProxyManager:
     A class to manage and rotate proxies for CloudScraper
     """
 
-    def __init__(self, proxies=None, proxy_rotation_strategy='sequential', ban_time=300):
+    def __init__(
+        self,
+        proxies=None,
+        proxy_rotation_strategy='sequential',
+        ban_time=300,
+        latency_weight=0.3,
+        exploration=0.05
+    ):
         """
         Initialize the proxy manager
-        
+
         :param proxies: List of proxy URLs or dict mapping URL schemes to proxy URLs
         :param proxy_rotation_strategy: Strategy for rotating proxies ('sequential', 'random', or 'smart')
         :param ban_time: Time in seconds to ban a proxy after a failure (for 'smart' strategy)
+        :param latency_weight: Weight of the newest sample in the latency and failure averages
+        :param exploration: Share of 'smart' picks made uniformly, to re-measure slow proxies
         """
         self.proxies = []
         self.current_index = 0
         self.rotation_strategy = proxy_rotation_strategy
         self.ban_time = ban_time
+        self.latency_weight = latency_weight
+        self.exploration = exploration
         self.banned_proxies = {}
-        self.proxy_stats = defaultdict(lambda: {'success': 0, 'failure': 0, 'last_used': 0})
-        
+        self.proxy_stats = defaultdict(lambda: {
+            'success': 0,
+            'failure': 0,
+            'last_used': 0,
+            'latency': None,
+            'failure_rate': 0.0,
+        })
+
+        self._lock = Lock()
+        self._slots = {}
+        self._weights = _WeightTree()
+        self._available = _WeightTree()
+        self._ban_expiry = []
+
         # Process the provided proxies
         if proxies:
             if isinstance(proxies, list):
-                self.proxies = proxies
+                candidates = proxies
             elif isinstance(proxies, dict):
                 # Extract unique proxy URLs from the dict
-                for scheme, proxy in proxies.items():
-                    if proxy and proxy not in self.proxies:
-                        self.proxies.append(proxy)
+                candidates = [proxy for proxy in proxies.values() if proxy]
             elif isinstance(proxies, str):
-                self.proxies = [proxies]
-                
+                candidates = [proxies]
+            else:
+                candidates = []
+            for proxy in candidates:
+                self._add(proxy)
+
         logging.debug(f"ProxyManager initialized with {len(self.proxies)} proxies using '{proxy_rotation_strategy}' strategy")
 
     # ------------------------------------------------------------------------------- #
 
+    def _throughput(self, proxy):
+        """
+        Expected successful requests per second through the proxy
+        """
+        stats = self.proxy_stats[proxy]
+        latency = stats['latency'] or DEFAULT_LATENCY
+        return max(1e-6, 1.0 - stats['failure_rate']) / max(latency, 1e-3)
+
+    def _refresh(self, proxy):
+        i = self._slots.get(proxy)
+        if i is None:
+            return
+        available = proxy not in self.banned_proxies
+        self._available.update(i, 1.0 if available else 0.0)
+        self._weights.update(i, self._throughput(proxy) if available else 0.0)
+
+    def _add(self, proxy):
+        if proxy in self._slots:
+            return False
+        self._slots[proxy] = len(self.proxies)
+        self.proxies.append(proxy)
+        self._available.append(0.0)
+        self._weights.append(0.0)
+        self._refresh(proxy)
+        return True
+
+    def _release_bans(self):
+        """
+        Lifts the bans that have run out
+        """
+        now = time.time()
+        while self._ban_expiry and self._ban_expiry[0][0] <= now:
+            _, banned_at, proxy = heapq.heappop(self._ban_expiry)
+            if self.banned_proxies.get(proxy) == banned_at:
+                del self.banned_proxies[proxy]
+                self._refresh(proxy)
+
+    # ------------------------------------------------------------------------------- #
+
     def get_proxy(self):
         """
         Get the next proxy according to the rotation strategy
-        
+
         :return: A proxy URL or dict mapping URL schemes to proxy URLs
         """
         if not self.proxies:
             return None
-            
-        # Filter out banned proxies
-        available_proxies = [p for p in self.proxies if p not in self.banned_proxies or 
-                            time.time() - self.banned_proxies[p] > self.ban_time]
-        
-        if not available_proxies:
-            logging.warning("All proxies are currently banned. Using the least recently banned one.")
-            # Use the least recently banned proxy
-            proxy = min(self.banned_proxies.items(), key=lambda x: x[1])[0]
-            # Reset its ban time
-            self.banned_proxies.pop(proxy)
-            return self._format_proxy(proxy)
-        
-        # Choose a proxy based on the strategy
-        if self.rotation_strategy == 'random':
-            proxy = random.choice(available_proxies)
-        elif self.rotation_strategy == 'smart':
-            # Choose the proxy with the best success rate
-            proxy = max(available_proxies, 
-                        key=lambda p: (self.proxy_stats[p]['success'] / 
-                                      (self.proxy_stats[p]['success'] + self.proxy_stats[p]['failure'] + 0.1)))
-        else:  # sequential
-            if self.current_index >= len(available_proxies):
-                self.current_index = 0
-            proxy = available_proxies[self.current_index]
-            self.current_index += 1
-            
-        # Update last used time
-        self.proxy_stats[proxy]['last_used'] = time.time()
-        
+
+        with self._lock:
+            self._release_bans()
+
+            if self._available.total() < 0.5:
+                logging.warning("All proxies are currently banned. Using the least recently banned one.")
+                # Use the least recently banned proxy, skipping the entries
+                # of proxies that were removed or banned again since
+                while self._ban_expiry:
+                    _, banned_at, proxy = heapq.heappop(self._ban_expiry)
+                    if proxy in self._slots and self.banned_proxies.get(proxy) == banned_at:
+                        break
+                else:
+                    proxy = min(self.banned_proxies.items(), key=lambda x: x[1])[0]
+                # Reset its ban time
+                self.banned_proxies.pop(proxy, None)
+                self._refresh(proxy)
+                return self._format_proxy(proxy)
+
+            # Choose a proxy based on the strategy
+            if self.rotation_strategy == 'random':
+                i = self._available.sample()
+            elif self.rotation_strategy == 'smart':
+                # Sample by expected throughput, with a little uniform exploration
+                if random.random() < self.exploration:
+                    i = self._available.sample()
+                else:
+                    i = self._weights.sample()
+                if i is None:
+                    i = self._available.sample()
+            else:  # sequential
+                for _ in range(len(self.proxies)):
+                    if self.current_index >= len(self.proxies):
+                        self.current_index = 0
+                    i = self.current_index
+                    self.current_index += 1
+                    if self.proxies[i] not in self.banned_proxies:
+                        break
+
+            proxy = self.proxies[i]
+
+            # Update last used time
+            self.proxy_stats[proxy]['last_used'] = time.time()
+
         return self._format_proxy(proxy)
 
     # ------------------------------------------------------------------------------- #
@@ -87,7 +244,7 @@ class ProxyManager:
     def _format_proxy(self, proxy):
         """
         Format the proxy as a dict for requests
-        
+
         :param proxy: Proxy URL
         :return: Dict mapping URL schemes to proxy URLs
         """
@@ -98,67 +255,102 @@ class ProxyManager:
 
     # ------------------------------------------------------------------------------- #
 
-    def report_success(self, proxy):
-        """
-        Report a successful request with the proxy
-        
-        :param proxy: The proxy that was used
-        """
+    def _proxy_url(self, proxy):
         if isinstance(proxy, dict):
             # Extract the proxy URL from the dict
             proxy_url = proxy.get('https') or proxy.get('http')
         else:
             proxy_url = proxy
-            
-        if proxy_url:
-            self.proxy_stats[proxy_url]['success'] += 1
-            if proxy_url in self.banned_proxies:
-                del self.banned_proxies[proxy_url]
+
+        # Formatting may have added a scheme to the stored proxy
+        if proxy_url and proxy_url not in self._slots and '://' in proxy_url:
+            bare = proxy_url.split('://', 1)[1]
+            if bare in self._slots:
+                return bare
+        return proxy_url
+
+    # ------------------------------------------------------------------------------- #
+
+    def report_success(self, proxy, latency=None):
+        """
+        Report a successful request with the proxy
+
+        :param proxy: The proxy that was used
+        :param latency: Seconds the request took, if measured
+        """
+        proxy_url = self._proxy_url(proxy)
+        if not proxy_url:
+            return
+
+        with self._lock:
+            stats = self.proxy_stats[proxy_url]
+            stats['success'] += 1
+            stats['failure_rate'] *= 1 - self.latency_weight
+            if latency is not None:
+                if stats['latency'] is None:
+                    stats['latency'] = latency
+                else:
+                    stats['latency'] += self.latency_weight * (latency - stats['latency'])
+            self.banned_proxies.pop(proxy_url, None)
+            self._refresh(proxy_url)
 
     # ------------------------------------------------------------------------------- #
 
     def report_failure(self, proxy):
         """
         Report a failed request with the proxy
-        
+
         :param proxy: The proxy that was used
         """
-        if isinstance(proxy, dict):
-            # Extract the proxy URL from the dict
-            proxy_url = proxy.get('https') or proxy.get('http')
-        else:
-            proxy_url = proxy
-            
-        if proxy_url:
-            self.proxy_stats[proxy_url]['failure'] += 1
-            self.banned_proxies[proxy_url] = time.time()
+        proxy_url = self._proxy_url(proxy)
+        if not proxy_url:
+            return
+
+        with self._lock:
+            stats = self.proxy_stats[proxy_url]
+            stats['failure'] += 1
+            stats['failure_rate'] += self.latency_weight * (1.0 - stats['failure_rate'])
+            banned_at = time.time()
+            self.banned_proxies[proxy_url] = banned_at
+            heapq.heappush(self._ban_expiry, (banned_at + self.ban_time, banned_at, proxy_url))
+            self._refresh(proxy_url)
 
     # ------------------------------------------------------------------------------- #
 
     def add_proxy(self, proxy):
         """
         Add a new proxy to the pool
-        
+
         :param proxy: Proxy URL to add
         """
-        if proxy not in self.proxies:
-            self.proxies.append(proxy)
-            logging.debug(f"Added proxy: {proxy}")
+        with self._lock:
+            if self._add(proxy):
+                logging.debug(f"Added proxy: {proxy}")
 
     # ------------------------------------------------------------------------------- #
 
     def remove_proxy(self, proxy):
         """
         Remove a proxy from the pool
-        
+
         :param proxy: Proxy URL to remove
         """
-        if proxy in self.proxies:
-            self.proxies.remove(proxy)
-            if proxy in self.banned_proxies:
-                del self.banned_proxies[proxy]
-            if proxy in self.proxy_stats:
-                del self.proxy_stats[proxy]
+        with self._lock:
+            i = self._slots.pop(proxy, None)
+            if i is None:
+                return
+
+            # move the last proxy into the freed slot
+            last = self.proxies.pop()
+            self._available.pop()
+            self._weights.pop()
+            if last != proxy:
+                self.proxies[i] = last
+                self._slots[last] = i
+                self._refresh(last)
+
+            self.banned_proxies.pop(proxy, None)
+            self.proxy_stats.pop(proxy, None)
             logging.debug(f"Removed proxy: {proxy}")
 
     # ------------------------------------------------------------------------------- #
@@ -166,13 +358,17 @@ class ProxyManager:
     def get_stats(self):
         """
         Get statistics about proxy usage
-        
+
         :return: Dict with proxy statistics
         """
-        return {
-            'total_proxies': len(self.proxies),
-            'available_proxies': len([p for p in self.proxies if p not in self.banned_proxies or 
-                                     time.time() - self.banned_proxies[p] > self.ban_time]),
-            'banned_proxies': len(self.banned_proxies),
-            'proxy_stats': dict(self.proxy_stats)
-        }
+        with self._lock:
+            self._release_bans()
+            return {
+                'total_proxies': len(self.proxies),
+                'available_proxies': len(self.proxies) - len(self.banned_proxies),
+                'banned_proxies': len(self.banned_proxies),
+                'proxy_stats': {
+                    proxy: dict(self.proxy_stats[proxy], throughput=self._throughput(proxy))
+                    for proxy in self.proxies
+                }
+            }
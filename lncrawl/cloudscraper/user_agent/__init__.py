@@ -6,6 +6,172 @@ import sys
 import ssl
 
 from collections import OrderedDict
+from functools import lru_cache
+from threading import Lock
+from types import MappingProxyType
+
+# ------------------------------------------------------------------------------- #
+# Ultimate fallback - used when browsers.json can not be found
+# ------------------------------------------------------------------------------- #
+
+FALLBACK_USER_AGENTS = {
+    "headers": {
+        "chrome": {
+            "User-Agent": None,
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8",
+            "Accept-Language": "en-US,en;q=0.9",
+            "Accept-Encoding": "gzip, deflate, br"
+        },
+        "firefox": {
+            "User-Agent": None,
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+            "Accept-Language": "en-US,en;q=0.5",
+            "Accept-Encoding": "gzip, deflate, br"
+        }
+    },
+    "cipherSuite": {
+        "chrome": [
+            "TLS_AES_128_GCM_SHA256",
+            "TLS_AES_256_GCM_SHA384",
+            "ECDHE-ECDSA-AES128-GCM-SHA256",
+            "ECDHE-RSA-AES128-GCM-SHA256",
+            "ECDHE-ECDSA-AES256-GCM-SHA384",
+            "ECDHE-RSA-AES256-GCM-SHA384"
+        ],
+        "firefox": [
+            "TLS_AES_128_GCM_SHA256",
+            "TLS_CHACHA20_POLY1305_SHA256",
+            "TLS_AES_256_GCM_SHA384",
+            "ECDHE-ECDSA-AES128-GCM-SHA256",
+            "ECDHE-RSA-AES128-GCM-SHA256",
+            "ECDHE-ECDSA-AES256-GCM-SHA384"
+        ]
+    },
+    "user_agents": {
+        "desktop": {
+            "windows": {
+                "chrome": [
+                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+                    "Mozilla/5.0 (Windows NT 10.0; WOW64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+                ],
+                "firefox": [
+                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:120.0) Gecko/20100101 Firefox/120.0",
+                    "Mozilla/5.0 (Windows NT 10.0; WOW64; rv:120.0) Gecko/20100101 Firefox/120.0"
+                ]
+            },
+            "linux": {
+                "chrome": [
+                    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+                    "Mozilla/5.0 (X11; Linux i686) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+                ],
+                "firefox": [
+                    "Mozilla/5.0 (X11; Linux x86_64; rv:120.0) Gecko/20100101 Firefox/120.0",
+                    "Mozilla/5.0 (X11; Linux i686; rv:120.0) Gecko/20100101 Firefox/120.0"
+                ]
+            },
+            "darwin": {
+                "chrome": [
+                    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+                ],
+                "firefox": [
+                    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:120.0) Gecko/20100101 Firefox/120.0"
+                ]
+            }
+        },
+        "mobile": {
+            "android": {
+                "chrome": [
+                    "Mozilla/5.0 (Linux; Android 10; SM-G973F) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Mobile Safari/537.36",
+                    "Mozilla/5.0 (Linux; Android 11; Pixel 5) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Mobile Safari/537.36"
+                ],
+                "firefox": [
+                    "Mozilla/5.0 (Mobile; rv:120.0) Gecko/120.0 Firefox/120.0"
+                ]
+            },
+            "ios": {
+                "chrome": [
+                    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) CriOS/120.0.0.0 Mobile/15E148 Safari/604.1"
+                ],
+                "firefox": [
+                    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) FxiOS/120.0.0.0 Mobile/15E148 Safari/605.1.15"
+                ]
+            }
+        }
+    }
+}
+
+# ------------------------------------------------------------------------------- #
+# The parsed browsers.json is shared by every User_Agent of the process.
+# It is frozen, so callers have to copy what they want to modify.
+# ------------------------------------------------------------------------------- #
+
+_database = None
+_database_lock = Lock()
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType(OrderedDict((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _read_browsers_json():
+    try:
+        # Try to load from the normal location
+        browsers_json_path = os.path.join(os.path.dirname(__file__), 'browsers.json')
+        with open(browsers_json_path, 'r') as fp:
+            return json.load(fp, object_pairs_hook=OrderedDict)
+    except (FileNotFoundError, IOError):
+        pass
+
+    # Fallback for executable environments
+    try:
+        # Try alternative paths for executables
+        if getattr(sys, 'frozen', False):
+            # Running in a PyInstaller bundle
+            bundle_dir = sys._MEIPASS  # type:ignore
+            browsers_json_path = os.path.join(bundle_dir, 'cloudscraper', 'user_agent', 'browsers.json')
+        else:
+            # Try current directory
+            browsers_json_path = os.path.join(os.getcwd(), 'browsers.json')
+
+        with open(browsers_json_path, 'r') as fp:
+            return json.load(fp, object_pairs_hook=OrderedDict)
+    except (FileNotFoundError, IOError):
+        return FALLBACK_USER_AGENTS
+
+
+def load_user_agents():
+    """
+    Returns the read-only user agent database, parsing browsers.json on first use
+    """
+    global _database
+    if _database is None:
+        with _database_lock:
+            if _database is None:
+                _database = _freeze(_read_browsers_json())
+    return _database
+
+
+@lru_cache(maxsize=None)
+def filter_agents(platform, desktop=True, mobile=True):
+    """
+    Returns a read-only map of browser -> user agents for the given platform
+    """
+    user_agents = load_user_agents()['user_agents']
+    filtered = OrderedDict()
+
+    if mobile:
+        if platform in user_agents['mobile'] and user_agents['mobile'][platform]:
+            filtered.update(user_agents['mobile'][platform])
+
+    if desktop:
+        if platform in user_agents['desktop'] and user_agents['desktop'][platform]:
+            filtered.update(user_agents['desktop'][platform])
+
+    return MappingProxyType(filtered)
 
 # ------------------------------------------------------------------------------- #
 
@@ -21,18 +187,8 @@ class User_Agent():
 
     # ------------------------------------------------------------------------------- #
 
-    def filterAgents(self, user_agents):
-        filtered = {}
-
-        if self.mobile:
-            if self.platform in user_agents['mobile'] and user_agents['mobile'][self.platform]:
-                filtered.update(user_agents['mobile'][self.platform])
-
-        if self.desktop:
-            if self.platform in user_agents['desktop'] and user_agents['desktop'][self.platform]:
-                filtered.update(user_agents['desktop'][self.platform])
-
-        return filtered
+    def filterAgents(self, user_agents=None):
+        return filter_agents(self.platform, bool(self.desktop), bool(self.mobile))
 
     # ------------------------------------------------------------------------------- #
 
@@ -41,9 +197,9 @@ class User_Agent():
             for platform in user_agents['user_agents'][device_type]:
                 for browser in user_agents['user_agents'][device_type][platform]:
                     if self.custom and re.search(re.escape(self.custom), ' '.join(user_agents['user_agents'][device_type][platform][browser])):
-                        self.headers = user_agents['headers'][browser]
+                        self.headers = OrderedDict(user_agents['headers'][browser])
                         self.headers['User-Agent'] = self.custom
-                        self.cipherSuite = user_agents['cipherSuite'][browser]
+                        self.cipherSuite = list(user_agents['cipherSuite'][browser])
                         return True
         return False
 
@@ -71,118 +227,7 @@ class User_Agent():
             sys.tracebacklimit = 0
             raise RuntimeError("Sorry you can't have mobile and desktop disabled at the same time.")
 
-        try:
-            # Try to load from the normal location
-            browsers_json_path = os.path.join(os.path.dirname(__file__), 'browsers.json')
-            with open(browsers_json_path, 'r') as fp:
-                user_agents = json.load(
-                    fp,
-                    object_pairs_hook=OrderedDict
-                )
-        except (FileNotFoundError, IOError):
-            # Fallback for executable environments
-            try:
-                # Try alternative paths for executables
-                if getattr(sys, 'frozen', False):
-                    # Running in a PyInstaller bundle
-                    bundle_dir = sys._MEIPASS  # type:ignore
-                    browsers_json_path = os.path.join(bundle_dir, 'cloudscraper', 'user_agent', 'browsers.json')
-                else:
-                    # Try current directory
-                    browsers_json_path = os.path.join(os.getcwd(), 'browsers.json')
-
-                with open(browsers_json_path, 'r') as fp:
-                    user_agents = json.load(
-                        fp,
-                        object_pairs_hook=OrderedDict
-                    )
-            except (FileNotFoundError, IOError):
-                # Ultimate fallback - use comprehensive hardcoded user agents
-                user_agents = {
-                    "headers": {
-                        "chrome": {
-                            "User-Agent": None,
-                            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8",
-                            "Accept-Language": "en-US,en;q=0.9",
-                            "Accept-Encoding": "gzip, deflate, br"
-                        },
-                        "firefox": {
-                            "User-Agent": None,
-                            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-                            "Accept-Language": "en-US,en;q=0.5",
-                            "Accept-Encoding": "gzip, deflate, br"
-                        }
-                    },
-                    "cipherSuite": {
-                        "chrome": [
-                            "TLS_AES_128_GCM_SHA256",
-                            "TLS_AES_256_GCM_SHA384",
-                            "ECDHE-ECDSA-AES128-GCM-SHA256",
-                            "ECDHE-RSA-AES128-GCM-SHA256",
-                            "ECDHE-ECDSA-AES256-GCM-SHA384",
-                            "ECDHE-RSA-AES256-GCM-SHA384"
-                        ],
-                        "firefox": [
-                            "TLS_AES_128_GCM_SHA256",
-                            "TLS_CHACHA20_POLY1305_SHA256",
-                            "TLS_AES_256_GCM_SHA384",
-                            "ECDHE-ECDSA-AES128-GCM-SHA256",
-                            "ECDHE-RSA-AES128-GCM-SHA256",
-                            "ECDHE-ECDSA-AES256-GCM-SHA384"
-                        ]
-                    },
-                    "user_agents": {
-                        "desktop": {
-                            "windows": {
-                                "chrome": [
-                                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                                    "Mozilla/5.0 (Windows NT 10.0; WOW64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-                                ],
-                                "firefox": [
-                                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:120.0) Gecko/20100101 Firefox/120.0",
-                                    "Mozilla/5.0 (Windows NT 10.0; WOW64; rv:120.0) Gecko/20100101 Firefox/120.0"
-                                ]
-                            },
-                            "linux": {
-                                "chrome": [
-                                    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                                    "Mozilla/5.0 (X11; Linux i686) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-                                ],
-                                "firefox": [
-                                    "Mozilla/5.0 (X11; Linux x86_64; rv:120.0) Gecko/20100101 Firefox/120.0",
-                                    "Mozilla/5.0 (X11; Linux i686; rv:120.0) Gecko/20100101 Firefox/120.0"
-                                ]
-                            },
-                            "darwin": {
-                                "chrome": [
-                                    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-                                ],
-                                "firefox": [
-                                    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:120.0) Gecko/20100101 Firefox/120.0"
-                                ]
-                            }
-                        },
-                        "mobile": {
-                            "android": {
-                                "chrome": [
-                                    "Mozilla/5.0 (Linux; Android 10; SM-G973F) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Mobile Safari/537.36",
-                                    "Mozilla/5.0 (Linux; Android 11; Pixel 5) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Mobile Safari/537.36"
-                                ],
-                                "firefox": [
-                                    "Mozilla/5.0 (Mobile; rv:120.0) Gecko/120.0 Firefox/120.0"
-                                ]
-                            },
-                            "ios": {
-                                "chrome": [
-                                    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) CriOS/120.0.0.0 Mobile/15E148 Safari/604.1"
-                                ],
-                                "firefox": [
-                                    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) FxiOS/120.0.0.0 Mobile/15E148 Safari/605.1.15"
-                                ]
-                            }
-                        }
-                    }
-                }
+        user_agents = load_user_agents()
 
         if self.custom:
             if not self.tryMatchCustom(user_agents):
@@ -209,7 +254,7 @@ class User_Agent():
                 sys.tracebacklimit = 0
                 raise RuntimeError(f'Sorry the platform "{self.platform}" is not valid, valid platforms are [{", ".join(self.platforms)}]')
 
-            filteredAgents = self.filterAgents(user_agents['user_agents'])
+            filteredAgents = self.filterAgents()
 
             if not self.browser:
                 # has to be at least one in there...
@@ -220,8 +265,8 @@ class User_Agent():
                 sys.tracebacklimit = 0
                 raise RuntimeError(f'Sorry "{self.browser}" browser was not found with a platform of "{self.platform}".')
 
-            self.cipherSuite = user_agents['cipherSuite'][self.browser]
-            self.headers = user_agents['headers'][self.browser]
+            self.cipherSuite = list(user_agents['cipherSuite'][self.browser])
+            self.headers = OrderedDict(user_agents['headers'][self.browser])
 
             self.headers['User-Agent'] = random.SystemRandom().choice(filteredAgents[self.browser])
 
@@ -2,3 +2,6 @@ import os
 
 DEFAULT_OUTPUT_PATH = os.getenv('OUTPUT_PATH') or os.path.abspath("Lightnovels")
 META_FILE_NAME = "meta.json"
+REQUEST_STATS_FILE_NAME = "request-stats.json"
+DEFAULT_CACHE_PATH = os.getenv('CACHE_PATH') or os.path.join(DEFAULT_OUTPUT_PATH, ".cache")
+CLEARANCE_STORE_FILE = os.path.join(DEFAULT_CACHE_PATH, "clearance.db")
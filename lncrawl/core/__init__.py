@@ -40,9 +40,11 @@ def init():
 
 def start_app():
     from ..bots import run_bot
+    from ..utils.dnscache import get_dns_cache
     from .arguments import get_args
     from .display import cancel_method, error_message
-    from .proxy import load_proxies, start_proxy_fetcher, stop_proxy_fetcher
+    from .proxy import (get_proxy_stats, load_proxies, start_proxy_fetcher,
+                        stop_proxy_fetcher)
     from .sources import load_sources
 
     init()
@@ -67,5 +69,13 @@ def start_app():
     except Exception:
         error_message(*sys.exc_info())
 
+    if os.getenv("use_proxy"):
+        for item in get_proxy_stats()[:10]:
+            logger.debug("Proxy usage: %s", item)
+
+    dns_cache = get_dns_cache()
+    if dns_cache:
+        logger.debug("DNS cache: %s", dns_cache.stats())
+
     if args.auto_proxy:
         stop_proxy_fetcher()
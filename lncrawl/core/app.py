@@ -4,7 +4,7 @@ import os
 import json # <--- ADDED
 from pathlib import Path
 from threading import Event
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 from urllib.parse import urlparse
 
 from readability import Document  # type: ignore
@@ -15,6 +15,7 @@ from ..binders import generate_books
 from ..core.exeptions import LNException
 from ..core.sources import crawler_list, prepare_crawler
 from ..models import Chapter, CombinedSearchResult, OutputFormat
+from ..utils.dnscache import get_dns_cache
 from .browser import Browser
 from .crawler import Crawler
 from .download_chapters import fetch_chapter_body, get_chapter_file # <--- MODIFIED
@@ -77,6 +78,26 @@ class App:
             + self.binding_progress * fmt_w
         )
 
+    @property
+    def request_stats(self) -> Dict[str, Any]:
+        """Timings, sizes and outcomes of the requests of the crawler, by host"""
+        if not self.crawler:
+            return {}
+        return self.crawler.request_metrics.summary()
+
+    def save_request_stats(self) -> None:
+        dns_cache = get_dns_cache()
+        if dns_cache:
+            logger.info("DNS cache: %s", dns_cache.stats())
+        if not self.crawler or not self.output_path or not Path(self.output_path).is_dir():
+            return
+        stats_file = Path(self.output_path) / C.REQUEST_STATS_FILE_NAME
+        try:
+            with open(stats_file, "w", encoding="utf-8") as fp:
+                json.dump(self.request_stats, fp, indent=2)
+        except OSError as e:
+            logger.debug(f"Failed to save request stats: {e}")
+
     # ----------------------------------------------------------------------- #
 
     def destroy(self):
@@ -224,6 +245,12 @@ class App:
 
     def start_download(self, signal=Event()):
         """Requires: crawler, chapters, output_path"""
+        try:
+            yield from self.__start_download(signal)
+        finally:
+            self.save_request_stats()
+
+    def __start_download(self, signal: Event):
         if not self.output_path:
             raise LNException("Output path is not defined")
         if not Path(self.output_path).is_dir():
@@ -239,6 +266,9 @@ class App:
 
         # 1. FETCH CHAPTER BODY
         for _ in fetch_chapter_body(self, signal):
+            if self.crawler and self.crawler.circuit.is_open:
+                logger.error("Halting download: %s is not responding", self.crawler.origin.hostname)
+                self.novel_status = "HALTED"
             if self.novel_status == "HALTED": # Check status signal from download threads
                 return # Stop the generator
             yield
@@ -0,0 +1,288 @@
+import asyncio
+import logging
+from concurrent.futures import Future
+from threading import Thread
+from typing import (TYPE_CHECKING, Any, Awaitable, Callable, Dict,
+                    MutableMapping, Optional, Tuple, Union)
+from urllib.parse import urlparse
+
+import httpx
+from bs4 import BeautifulSoup, Tag
+from tenacity import (AsyncRetrying, RetryCallState, stop_after_attempt,
+                      wait_random_exponential)
+
+from ..utils.circuit import get_circuit, retry_budget
+from ..utils.hostlimit import get_shared_limiter
+from .exeptions import CircuitOpenError
+
+if TYPE_CHECKING:
+    from .scraper import Scraper
+
+logger = logging.getLogger(__name__)
+
+MAX_CONNECTIONS = 1000
+
+# Seconds between attempts to take a slot from the host gate or the shared limiter
+POLL_INTERVAL = 0.05
+
+AsyncRetryErrorGroup = (httpx.TransportError,)
+
+# Status codes of responses worth retrying
+RETRY_STATUS_CODES = {429}
+
+
+def is_retryable(e: Optional[BaseException]) -> bool:
+    if isinstance(e, httpx.HTTPStatusError):
+        status = e.response.status_code
+        return status in RETRY_STATUS_CODES or status >= 500
+    return isinstance(e, AsyncRetryErrorGroup)
+
+
+def is_host_failure(e: BaseException) -> bool:
+    """Whether the error means the host is down, as opposed to refusing us"""
+    if isinstance(e, httpx.HTTPStatusError):
+        return e.response.status_code >= 500
+    if isinstance(e, httpx.ProxyError):
+        return False  # the proxy is at fault, not the host
+    return isinstance(e, (httpx.NetworkError, httpx.TimeoutException))
+
+
+class AsyncScraper:
+    def __init__(
+        self,
+        scraper: "Scraper",
+        max_connections: int = MAX_CONNECTIONS,
+    ) -> None:
+        """An asyncio engine for coroutine-aware crawlers.
+
+        It runs an event loop in a background thread and an async HTTP client on it,
+        so thousands of requests can be in flight without an OS thread for each.
+        Headers and cookies are shared with the sync scraper, and every request goes
+        through the same adaptive per-host gate, circuit breaker and retry budget.
+
+        Args:
+        - scraper (Scraper): The owner of this engine.
+        - max_connections (int, optional): Maximum number of open connections. Default: 1000.
+        """
+        self.scraper = scraper
+        self.max_connections = max_connections
+        self._client: Optional[httpx.AsyncClient] = None
+        self._slots: Dict[str, asyncio.Lock] = {}
+        self._loop = asyncio.new_event_loop()
+        self._thread = Thread(
+            target=self._loop.run_forever,
+            name="lncrawl_async",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def close(self) -> None:
+        if self._loop.is_closed():
+            return
+        if self._client:
+            try:
+                self.submit(self._client.aclose).result(5)
+            except Exception:
+                pass
+            self._client = None
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(5)
+        if not self._loop.is_running():
+            self._loop.close()
+
+    def submit(self, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Future:
+        """Schedules the coroutine fn(*args, **kwargs) in the event loop.
+
+        Returns:
+            A concurrent Future, that can be resolved with the TaskManager.
+        """
+        return asyncio.run_coroutine_threadsafe(fn(*args, **kwargs), self._loop)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if not self._client:
+            self._client = httpx.AsyncClient(
+                headers={
+                    str(k): str(v)
+                    for k, v in self.scraper.headers.items()
+                    if v is not None
+                },
+                follow_redirects=True,
+                http2=self.scraper.use_http2,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+        return self._client
+
+    async def _acquire(self, hostname: str) -> None:
+        gate = self.scraper.domain_gate(hostname)
+        shared = get_shared_limiter()
+        # one coroutine per host polls the gates, the others wait for their turn
+        async with self._slots.setdefault(hostname, asyncio.Lock()):
+            # never block the event loop on the thread or process locks
+            while not gate.acquire(blocking=False):
+                await asyncio.sleep(POLL_INTERVAL)
+            if not shared:
+                return
+            try:
+                while not shared.acquire(hostname, timeout=0):
+                    await asyncio.sleep(POLL_INTERVAL)
+            except BaseException:
+                gate.release()
+                raise
+
+    async def _release(self, hostname: str) -> None:
+        shared = get_shared_limiter()
+        if shared:
+            shared.release(hostname)
+        self.scraper.domain_gate(hostname).release()
+
+    async def _process_request(
+        self,
+        method: str,
+        url: str,
+        max_retries: Optional[int] = None,
+        headers: Optional[MutableMapping] = {},
+        timeout: Optional[Union[float, Tuple[float, float]]] = None,
+        **kwargs,
+    ) -> httpx.Response:
+        hostname = urlparse(url).hostname or ''
+        gate = self.scraper.domain_gate(hostname)
+
+        headers = dict(headers or {})
+        headers.setdefault("Origin", self.scraper.home_url.strip("/"))
+        headers.setdefault("Referer", self.scraper.last_soup_url or self.scraper.home_url)
+        if isinstance(timeout, tuple):
+            timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+
+        circuit = get_circuit(hostname)
+
+        async def _do_request() -> httpx.Response:
+            if not circuit.allow():
+                raise CircuitOpenError(f"Circuit is open for {hostname}")
+            retry_budget.record_request()
+            waited_from = self._loop.time()
+            await self._acquire(hostname)
+            start = self._loop.time()
+            status = None
+            response = None
+            error = None
+            try:
+                self.client.cookies.update(self.scraper.cookies)
+                response = await self.client.request(
+                    method,
+                    url,
+                    headers=headers,
+                    timeout=timeout,
+                    **kwargs,
+                )
+                status = response.status_code
+                response.raise_for_status()
+            except BaseException as e:
+                error = e
+                if is_host_failure(e):
+                    circuit.record_failure()
+                else:
+                    circuit.record_neutral()
+                raise
+            finally:
+                now = self._loop.time()
+                gate.feedback(status, now - start)
+                await self._release(hostname)
+                self.scraper.request_metrics.record(
+                    hostname,
+                    status=status,
+                    error=error,
+                    gate_wait=start - waited_from,
+                    bytes_in=len(response.content) if response is not None else None,
+                    total=now - waited_from,
+                )
+
+            circuit.record_success()
+            for name, value in response.cookies.items():
+                self.scraper.set_cookie(name, value)
+            return response
+
+        def _should_retry(retry_state: RetryCallState) -> bool:
+            future = retry_state.outcome
+            if not future or not is_retryable(future.exception()):
+                return False
+            if retry_state.attempt_number >= (max_retries or 0):
+                return False  # last attempt; do not spend the budget
+            return retry_budget.try_retry()
+
+        logger.debug(f"[{method.upper()}] {url} (async)")
+        async for attempt in AsyncRetrying(
+            stop=stop_after_attempt(max_retries or 0),
+            wait=wait_random_exponential(multiplier=0.5, max=60),
+            retry=_should_retry,
+            reraise=True,
+        ):
+            if attempt.retry_state.attempt_number > 1:
+                self.scraper.request_metrics.record_retry(hostname)
+            with attempt:
+                return await _do_request()
+        raise httpx.RequestError(f"No response: {url}")
+
+    async def get_response(
+        self,
+        url: str,
+        timeout: Optional[Union[float, Tuple[float, float]]] = (7, 301),
+        **kwargs,
+    ) -> httpx.Response:
+        return await self._process_request(
+            "get",
+            url,
+            timeout=timeout,
+            max_retries=2,
+            **kwargs,
+        )
+
+    async def get_soup(
+        self,
+        url: str,
+        headers: Optional[MutableMapping] = {},
+        encoding: Optional[str] = None,
+        **kwargs,
+    ) -> BeautifulSoup:
+        headers = dict(headers or {})
+        headers.setdefault(
+            "Accept",
+            "text/html,application/xhtml+xml,application/xml;q=0.9",
+        )
+        response = await self.get_response(url, headers=headers, **kwargs)
+        self.scraper.last_soup_url = url
+        return self.scraper.make_soup(response.content, encoding)
+
+    async def get_region(
+        self,
+        url: str,
+        selector: str,
+        headers: Optional[MutableMapping] = {},
+        encoding: Optional[str] = None,
+        **kwargs,
+    ) -> Optional[Tag]:
+        headers = dict(headers or {})
+        headers.setdefault(
+            "Accept",
+            "text/html,application/xhtml+xml,application/xml;q=0.9",
+        )
+        response = await self.get_response(url, headers=headers, **kwargs)
+        self.scraper.last_soup_url = url
+        return self.scraper.make_region(response.content, selector, encoding)
+
+    async def get_json(
+        self,
+        url: str,
+        headers: Optional[MutableMapping] = {},
+        **kwargs,
+    ) -> Any:
+        headers = dict(headers or {})
+        headers.setdefault(
+            "Accept",
+            "application/json,text/plain,*/*",
+        )
+        response = await self.get_response(url, headers=headers, **kwargs)
+        return response.json()
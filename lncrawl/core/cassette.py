@@ -0,0 +1,263 @@
+import atexit
+import glob
+import gzip
+import hashlib
+import json
+import logging
+import os
+import time
+from base64 import b64decode, b64encode
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+
+from requests import PreparedRequest, Response, Session
+from requests.adapters import BaseAdapter
+from requests.exceptions import ConnectionError
+
+from .. import constants as C
+from .transport import build_response
+
+logger = logging.getLogger(__name__)
+
+RECORD = "record"
+REPLAY = "replay"
+
+
+def _request_key(request: PreparedRequest) -> Tuple[str, str, str]:
+    body = request.body or b""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    return (
+        (request.method or "GET").upper(),
+        request.url or "",
+        hashlib.sha1(body).hexdigest() if body else "",
+    )
+
+
+def _response_headers(response: Response) -> List[Tuple[str, str]]:
+    # the original message keeps repeated headers, like Set-Cookie
+    original = getattr(response.raw, "_original_response", None)
+    msg = getattr(original, "msg", None)
+    if msg is not None:
+        return [(str(k), str(v)) for k, v in msg.items()]
+    return [(str(k), str(v)) for k, v in response.headers.items()]
+
+
+class Cassette(object):
+    def __init__(
+        self,
+        path: str,
+        mode: str = REPLAY,
+        latency: Optional[float] = None,
+        bandwidth: Optional[float] = None,
+    ) -> None:
+        """A file of recorded HTTP exchanges, to replay a crawl offline.
+
+        In record mode every response passing through a mounted session is
+        appended to a gzipped JSON lines file. Each process writes its own file
+        next to the path, named `<path>.<pid>`, so worker processes never mix
+        their writes. A streamed body is recorded once it has been read to the
+        end. In replay mode the responses are served from the path and all the
+        files of the processes, in the order they were recorded, and a request
+        that was never recorded fails like a connection error.
+
+        Args:
+        - path (str): The cassette file.
+        - mode (str, optional): Either "record" or "replay". Default: "replay".
+        - latency (float, optional): Seconds to wait before each replayed response.
+            A negative value waits as long as the recorded response took.
+        - bandwidth (float, optional): Bytes per second to replay response bodies at.
+        """
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self._lock = Lock()
+        self._file: Any = None
+        self._entries: Dict[Tuple[str, str, str], List[Dict[str, Any]]] = {}
+        self._served: Dict[Tuple[str, str, str], int] = {}
+        if mode == REPLAY:
+            self._load()
+
+    def _files(self) -> List[str]:
+        files = [self.path] if os.path.isfile(self.path) else []
+        parts = glob.glob(glob.escape(self.path) + ".*")
+        files += sorted(x for x in parts if x.rsplit(".", 1)[-1].isdigit())
+        return files
+
+    def _load(self) -> None:
+        files = self._files()
+        if not files:
+            raise FileNotFoundError(f"No cassette found at {self.path}")
+        for file in files:
+            try:
+                with gzip.open(file, "rt", encoding="utf-8") as fp:
+                    for line in fp:
+                        if not line.strip():
+                            continue
+                        entry = json.loads(line)
+                        key = (entry["method"], entry["url"], entry["body"])
+                        self._entries.setdefault(key, []).append(entry)
+            except (EOFError, ValueError) as e:
+                # a recording that was killed leaves an incomplete last line
+                logger.warning(f"Cassette is truncated: {file} | {e}")
+            except OSError as e:
+                logger.warning(f"Cassette is not readable: {file} | {e}")
+        logger.info(f"Loaded {len(self._entries)} requests from cassette: {self.path}")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+    def mount(self, session: Session) -> None:
+        """Routes all requests of the session through this cassette"""
+        for prefix in ("https://", "http://"):
+            inner = session.get_adapter(prefix)
+            session.mount(prefix, CassetteAdapter(self, inner))
+
+    def record(self, request: PreparedRequest, response: Response, stream: bool = False) -> None:
+        """Records the response. A streamed body is recorded when it has been read."""
+        method, url, body = _request_key(request)
+        entry: Dict[str, Any] = {
+            "method": method,
+            "url": url,
+            "body": body,
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": _response_headers(response),
+            "elapsed": response.elapsed.total_seconds(),
+        }
+        if stream and hasattr(response.raw, "stream"):
+            response.raw = _TeeBody(response.raw, lambda content: self._write(entry, content))
+        else:
+            self._write(entry, response.content or b"")
+
+    def _write(self, entry: Dict[str, Any], content: bytes) -> None:
+        try:
+            entry["text"] = content.decode("utf-8")
+        except UnicodeDecodeError:
+            entry["base64"] = b64encode(content).decode("ascii")
+
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            if not self._file:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                # each run appends a new gzip member, which reads back as one file
+                self._file = gzip.open(f"{self.path}.{os.getpid()}", "at", encoding="utf-8")
+            self._file.write(line)
+
+    def replay(self, request: PreparedRequest, adapter: BaseAdapter) -> Response:
+        key = _request_key(request)
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                raise ConnectionError(f"Not in cassette: {key[0]} {key[1]}", request=request)
+            # serve repeated requests in order, then keep serving the last one
+            index = self._served.get(key, 0)
+            self._served[key] = index + 1
+        entry = entries[min(index, len(entries) - 1)]
+
+        if "base64" in entry:
+            content = b64decode(entry["base64"])
+        else:
+            content = entry.get("text", "").encode("utf-8")
+
+        delay = 0.0
+        if self.latency is not None:
+            delay += entry["elapsed"] if self.latency < 0 else self.latency
+        if self.bandwidth:
+            delay += len(content) / self.bandwidth
+        if delay > 0:
+            time.sleep(delay)
+
+        return build_response(
+            request,
+            status_code=entry["status"],
+            headers=[(k, v) for k, v in entry["headers"]],
+            body=iter([content]),
+            reason=entry.get("reason") or "",
+            elapsed=entry["elapsed"],
+            connection=adapter,
+        )
+
+
+class _TeeBody(object):
+    """Wraps the raw body of a streamed response, and hands the whole body
+    to the callback once it has been read to the end"""
+
+    def __init__(self, raw: Any, on_complete) -> None:
+        self._raw = raw
+        self._on_complete = on_complete
+
+    def stream(self, amt: int = 65536, decode_content: Optional[bool] = None):
+        chunks = []
+        for chunk in self._raw.stream(amt, decode_content=decode_content):
+            chunks.append(chunk)
+            yield chunk
+        self._on_complete(b"".join(chunks))
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._raw, name)
+
+
+class CassetteAdapter(BaseAdapter):
+    """Records the responses of the inner adapter, or replays them from the cassette"""
+
+    def __init__(self, cassette: Cassette, inner: BaseAdapter) -> None:
+        super().__init__()
+        self.cassette = cassette
+        self.inner = inner
+
+    def send(self, request: PreparedRequest, stream: bool = False, **kwargs) -> Response:
+        if self.cassette.mode == REPLAY:
+            response = self.cassette.replay(request, self)
+        else:
+            response = self.inner.send(request, stream=stream, **kwargs)
+            self.cassette.record(request, response, stream)
+        if not stream:
+            response.content
+        return response
+
+    def close(self) -> None:
+        self.inner.close()
+
+
+_cassette_lock = Lock()
+_cassette: Optional[Cassette] = None
+_cassette_failed = False
+
+
+def get_cassette() -> Optional[Cassette]:
+    """Returns the process-wide cassette if it is enabled.
+
+    It is configured by these environment variables:
+    - CASSETTE_MODE: Either "record" or "replay". Disabled if empty.
+    - CASSETTE_PATH: The cassette file. Default: CACHE_PATH/cassette.jsonl.gz.
+    - CASSETTE_LATENCY: Seconds to delay each replayed response, or "recorded".
+    - CASSETTE_BANDWIDTH: Replay bandwidth in KB per second. Unlimited if empty.
+    """
+    global _cassette, _cassette_failed
+    mode = os.getenv("CASSETTE_MODE", "").lower()
+    if _cassette is None and mode and not _cassette_failed:
+        with _cassette_lock:
+            if _cassette is None and not _cassette_failed:
+                latency = os.getenv("CASSETTE_LATENCY", "")
+                bandwidth = os.getenv("CASSETTE_BANDWIDTH", "")
+                try:
+                    _cassette = Cassette(
+                        path=os.getenv("CASSETTE_PATH") or os.path.join(C.DEFAULT_CACHE_PATH, "cassette.jsonl.gz"),
+                        mode=mode,
+                        latency=-1 if latency == "recorded" else float(latency) if latency else None,
+                        bandwidth=float(bandwidth) * 1024 if bandwidth else None,
+                    )
+                except (OSError, ValueError) as e:
+                    # a broken setup should not break every crawler
+                    logger.error(f"Cassette is disabled: {e}")
+                    _cassette_failed = True
+                    return None
+                atexit.register(_cassette.close)
+    return _cassette
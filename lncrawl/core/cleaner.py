@@ -2,28 +2,153 @@ import itertools
 import re
 import sys
 import unicodedata
-from typing import Any, Dict, List, Set, Union
+from functools import lru_cache, partial
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Set, Tuple, Union
 
+import soupsieve
 from bs4 import Comment, Tag
 
 
+# Ranges of the format characters (category Cf) of known unicode versions.
+# Control characters (category Cc) are the same in every version.
+CONTROL_CHAR_RANGES = ((0x00, 0x1F), (0x7F, 0x9F))
+FORMAT_CHAR_RANGES = {
+    "13.0.0": (
+        (0x00AD, 0x00AD), (0x0600, 0x0605), (0x061C, 0x061C), (0x06DD, 0x06DD),
+        (0x070F, 0x070F), (0x08E2, 0x08E2), (0x180E, 0x180E), (0x200B, 0x200F),
+        (0x202A, 0x202E), (0x2060, 0x2064), (0x2066, 0x206F), (0xFEFF, 0xFEFF),
+        (0xFFF9, 0xFFFB), (0x110BD, 0x110BD), (0x110CD, 0x110CD), (0x13430, 0x13438),
+        (0x1BCA0, 0x1BCA3), (0x1D173, 0x1D17A), (0xE0001, 0xE0001), (0xE0020, 0xE007F),
+    ),
+    "14.0.0": (
+        (0x00AD, 0x00AD), (0x0600, 0x0605), (0x061C, 0x061C), (0x06DD, 0x06DD),
+        (0x070F, 0x070F), (0x0890, 0x0891), (0x08E2, 0x08E2), (0x180E, 0x180E),
+        (0x200B, 0x200F), (0x202A, 0x202E), (0x2060, 0x2064), (0x2066, 0x206F),
+        (0xFEFF, 0xFEFF), (0xFFF9, 0xFFFB), (0x110BD, 0x110BD), (0x110CD, 0x110CD),
+        (0x13430, 0x13438), (0x1BCA0, 0x1BCA3), (0x1D173, 0x1D17A), (0xE0001, 0xE0001),
+        (0xE0020, 0xE007F),
+    ),
+}
+
+
+@lru_cache(maxsize=None)
+def _invisible_chars(unidata_version: str) -> Tuple[int, ...]:
+    known = FORMAT_CHAR_RANGES.get(unidata_version)
+    if known:
+        return tuple(sorted(
+            code
+            for start, end in CONTROL_CHAR_RANGES + known
+            for code in range(start, end + 1)
+        ))
+    # scanning every code point is slow; do it once per process and unicode version
+    return tuple(
+        code
+        for code in range(sys.maxunicode)
+        if unicodedata.category(chr(code)) in {"Cf", "Cc"}
+    )
+
+
+@lru_cache(maxsize=None)
+def _nonprintable_mapping(unidata_version: str) -> Mapping[int, None]:
+    unprintable_chars = itertools.chain(
+        range(0x00, 0x20),
+        range(0x7F, 0xA0),
+        _invisible_chars(unidata_version),
+    )
+    return MappingProxyType({character: None for character in unprintable_chars})
+
+
+def _rule_key(rules: Any) -> Any:
+    """A hashable snapshot of a rule set, to tell when it has changed"""
+    if isinstance(rules, dict):
+        return tuple((k, _rule_key(v)) for k, v in rules.items())
+    if isinstance(rules, (list, tuple)):
+        return tuple(_rule_key(x) for x in rules)
+    if isinstance(rules, (set, frozenset)):
+        return frozenset(rules)
+    return rules
+
+
+def _alternation(patterns: Any) -> str:
+    return "|".join([f"({x.pattern if isinstance(x, re.Pattern) else x})" for x in patterns if x])
+
+
+# Line breaks pending in an element, ordered so `min` tells if any breaks
+_HARD_BREAK = 0  # a line separator, which an empty inline element takes back
+_SOFT_BREAK = 1  # a line separator inside of a text
+_NO_BREAK = 2  # an empty text, which keeps the break before it
+
+
+class _LineLevel:
+    """An element being walked by `TextCleaner.extract_paragraphs`, with the
+    tags to open and close a line in it, including the ones of its parents"""
+
+    __slots__ = ("opening", "closing", "breaks")
+
+    def __init__(self, opening: str, closing: str) -> None:
+        self.opening = opening
+        self.closing = closing
+        self.breaks: List[int] = []
+
+
+class CleanerPlan:
+    """The selectors and patterns of a TextCleaner, compiled once.
+
+    A plan is built from a snapshot of the rule sets and is replaced by the
+    cleaner as soon as any of them changes, so rules added later, e.g. in
+    the `initialize` of a crawler, are never missed.
+    """
+
+    def __init__(self, cleaner: "TextCleaner") -> None:
+        self.bad_css = None
+        if cleaner.bad_css:
+            self.bad_css = soupsieve.compile(",".join(cleaner.bad_css))
+
+        self.bad_tag_selector = None
+        self.bad_tag_patterns: Dict[str, Optional[re.Pattern[str]]] = {}
+        if cleaner.bad_tag_text_pairs:
+            self.bad_tag_selector = soupsieve.compile(",".join(cleaner.bad_tag_text_pairs.keys()))
+            for name, pattern in cleaner.bad_tag_text_pairs.items():
+                if isinstance(pattern, list):
+                    pattern = _alternation(pattern)
+                if pattern and not isinstance(pattern, re.Pattern):
+                    pattern = re.compile(pattern, re.M)
+                self.bad_tag_patterns[name] = pattern or None
+
+        self.bad_text = None
+        if cleaner.bad_text_regex:
+            self.bad_text = re.compile(_alternation(cleaner.bad_text_regex))
+
+        self.substitutions = {k.lower(): v for k, v in cleaner.substitutions.items()}
+        self.substitution_regex = None
+        if cleaner.substitutions:
+            self.substitution_regex = re.compile(
+                _alternation(cleaner.substitutions.keys()),
+                flags=re.IGNORECASE,
+            )
+
+    def substitute(self, text: str) -> str:
+        if not self.substitution_regex:
+            return text
+        return self.substitution_regex.sub(
+            lambda m: self.substitutions.get(m.group(0).lower(), m.group(0)), text
+        )
+
+
 class TextCleaner:
     def __init__(self) -> None:
         self.line_separator = "<br>"
-        self.invisible_chars = [
-            code
-            for code in range(sys.maxunicode)
-            if unicodedata.category(chr(code)) in {"Cf", "Cc"}
-        ]
+        self.invisible_chars = _invisible_chars(unicodedata.unidata_version)
         self.unprintable_chars = itertools.chain(
             range(0x00, 0x20),
             range(0x7F, 0xA0),
             self.invisible_chars,
         )
-        self.nonprintable_mapping = {
-            character: None
-            for character in self.unprintable_chars
-        }
+        # a copy of the shared table, so a crawler can change its own
+        self.nonprintable_mapping: Dict[int, Optional[str]] = dict(
+            _nonprintable_mapping(unicodedata.unidata_version)
+        )
 
         self.bad_text_regex: Set[Union[str, re.Pattern[str]]] = set(
             [
@@ -149,16 +274,38 @@ class TextCleaner:
             "data-src",
             "src",
         }
+        # called with every image kept while cleaning, to rewrite it in place
+        self.image_handler: Optional[Callable[[Tag], Any]] = None
+
+    @property
+    def plan(self) -> CleanerPlan:
+        """The compiled rules; rebuilt only when a rule set has changed.
+
+        The rule sets are compared once per call of a public method; the
+        private helpers called for every text node take the plan found there.
+        """
+        key = (
+            _rule_key(self.bad_css),
+            _rule_key(self.bad_tag_text_pairs),
+            _rule_key(self.bad_text_regex),
+            _rule_key(self.substitutions),
+        )
+        state = getattr(self, "_plan_state", None)
+        if state is None or state[0] != key:
+            # swapped in one assignment, as cleaners are shared by threads
+            state = self._plan_state = (key, CleanerPlan(self))
+        return state[1]
 
     def extract_contents(self, tag) -> str:
         self.clean_contents(tag)
         body = self.extract_paragraphs(tag)
         paragraphs = " ".join(body).split(self.line_separator)
+        plan = self.plan
         return "".join(
             [
                 f"<p>{p.strip()}</p>"
                 for p in paragraphs
-                if not self.contains_bad_texts(p)
+                if not self._contains_bad_texts(p, plan)
             ]
         )
 
@@ -166,13 +313,14 @@ class TextCleaner:
         if not isinstance(div, Tag):
             return div
 
-        if self.bad_css:
-            for bad in div.select(",".join(self.bad_css)):
+        plan = self.plan
+        if plan.bad_css:
+            for bad in plan.bad_css.select(div):
                 bad.extract()
 
-        if self.bad_tag_text_pairs:
-            for tag in div.select(",".join(self.bad_tag_text_pairs.keys())):
-                if self.tag_contains_bad_text(tag):
+        if plan.bad_tag_selector:
+            for tag in plan.bad_tag_selector.select(div):
+                if self._tag_contains_bad_text(tag, plan):
                     tag.extract()
 
         for tag in div.find_all(True):
@@ -194,17 +342,12 @@ class TextCleaner:
         return div
 
     def clean_text(self, text) -> str:
+        return self._clean_text(text, self.plan)
+
+    def _clean_text(self, text, plan: CleanerPlan) -> str:
         text = str(text).strip()
         text = text.translate(self.nonprintable_mapping)
-        if not hasattr(self, "_subs_"):
-            self._subs_ = re.compile(
-                "|".join([f"({x})" for x in self.substitutions.keys()]),
-                flags=re.IGNORECASE,
-            )
-        text = self._subs_.sub(
-            lambda m: self.substitutions[str(m.group(0)).lower()], text
-        )
-        return text
+        return plan.substitute(text)
 
     def extract_on_duplicate_sibling(self, tag: Tag):
         next_tag = tag.next_sibling
@@ -225,16 +368,14 @@ class TextCleaner:
         tag.attrs = attrs
 
     def tag_contains_bad_text(self, tag: Tag) -> bool:
-        pattern = self.bad_tag_text_pairs.get(tag.name)
+        return self._tag_contains_bad_text(tag, self.plan)
+
+    def _tag_contains_bad_text(self, tag: Tag, plan: CleanerPlan) -> bool:
+        pattern = plan.bad_tag_patterns.get(tag.name)
         if not tag.text:
             return True
         if not pattern:
             return False
-        if isinstance(pattern, list):
-            pattern = "|".join([f"({x})" for x in pattern if x])
-        if not isinstance(pattern, re.Pattern):
-            pattern = re.compile(pattern, re.M)
-            self.bad_tag_text_pairs[tag.name] = pattern
         return bool(pattern.search(tag.text))
 
     def clean_image(self, tag: Tag):
@@ -247,6 +388,8 @@ class TextCleaner:
             tag.extract()
         else:
             tag.attrs = {"src": src}
+            if self.image_handler:
+                self.image_handler(tag)
 
     def clean_style_value(self, style: str) -> str:
         clean_css = []
@@ -262,57 +405,161 @@ class TextCleaner:
         return ";".join(clean_css)
 
     def extract_paragraphs(self, tag) -> list:
+        """Returns the texts and line separators of the paragraphs in a tag.
+
+        The tree is walked once, writing the lines of nested elements into one
+        buffer. Each line is wrapped in the tags of the elements around it,
+        unless they are a block or a plain text tag. Line breaks are held back
+        until the next text arrives, as an empty element that is not a block
+        takes back the line break before it.
+        """
         if not isinstance(tag, Tag):
             return []
 
-        body = []
+        sep = self.line_separator
+        clean_text = partial(self._clean_text, plan=self.plan)
+        block_tags = self.p_block_tags
+        plain_tags = self.plain_text_tags
+        unchanged_tags = self.unchanged_tags
+
+        body: List[str] = []
+        buffer: List[str] = []
+        levels: List[_LineLevel] = []
+        opened = 0  # the elements with an open line, from the outermost
+
+        def flush() -> None:
+            body.append("".join(buffer))
+            body.append(sep)
+            buffer.clear()
+
+        def arrive() -> None:
+            # an item is written to the innermost element. a pending line break
+            # can only be in the innermost element with an open line, and ends
+            # the lines of all elements around it too.
+            nonlocal opened
+            opening = ""
+            if opened:
+                level = levels[opened - 1]
+                breaks = level.breaks
+                if breaks and min(breaks) < _NO_BREAK:
+                    buffer.append(level.closing)
+                    flush()
+                else:
+                    opening = level.opening
+                    buffer.append(" ")
+                breaks.clear()
+            for level in levels[opened:]:
+                level.breaks.clear()
+            buffer.append(levels[-1].opening[len(opening):])
+            opened = len(levels)
+
+        def write(raw: str, level: _LineLevel) -> None:
+            if raw == sep:
+                level.breaks.append(_HARD_BREAK)
+                return
+            text = raw.strip()
+            if not text:
+                level.breaks.append(_NO_BREAK)
+                return
+            if sep not in text:
+                if opened == len(levels) and not level.breaks:
+                    buffer.append(" ")
+                else:
+                    arrive()
+                buffer.append(text)
+                return
+            # a separator inside of a text breaks the line, but can not be taken back
+            for k, part in enumerate(text.split(sep)):
+                if k:
+                    level.breaks.append(_SOFT_BREAK)
+                part = part.strip()
+                if part:
+                    arrive()
+                    buffer.append(part)
+
+        def walk(parent: Tag, level: _LineLevel) -> None:
+            nonlocal opened
+            for elem in parent.contents:
+                if not isinstance(elem, Tag):
+                    if not isinstance(elem, Comment):
+                        write(clean_text(elem), level)
+                    continue
+                name = elem.name
+                if name in unchanged_tags:
+                    write(str(elem), level)
+                    continue
+                if name == "br" or name == "hr":
+                    level.breaks.append(_HARD_BREAK)
+                    continue
+
+                is_block = name in block_tags
+                if is_block:
+                    level.breaks.append(_HARD_BREAK)
+                wrap = not (is_block or name in plain_tags)
+                if wrap:
+                    child = _LineLevel(f"{level.opening}<{name}>", f"</{name}>{level.closing}")
+                else:
+                    child = _LineLevel(level.opening, level.closing)
+                levels.append(child)
+                walk(elem, child)
+                if opened == len(levels):
+                    opened -= 1
+                    if wrap:
+                        buffer.append(f"</{name}>")
+                    level.breaks.append(_HARD_BREAK)
+                levels.pop()
+
+                breaks = level.breaks
+                if not is_block and breaks and breaks[-1] == _HARD_BREAK:
+                    breaks.pop()
+
+        # the tag itself is not wrapped, and the lines of its children are kept apart
         for elem in tag.contents:
             if isinstance(elem, Comment):
                 continue
             if not isinstance(elem, Tag):
-                body.append(self.clean_text(elem))
+                body.append(clean_text(elem))
                 continue
-            if elem.name in self.unchanged_tags:
+            if elem.name in unchanged_tags:
                 body.append(str(elem))
                 continue
             if elem.name == "hr":
-                body.append(self.line_separator)
+                body.append(sep)
                 # body.append('-' * 8)
                 # body.append(LINE_SEP)
                 continue
             if elem.name == "br":
-                body.append(self.line_separator)
+                body.append(sep)
                 continue
-            # if not elem.text.strip():
-            #     continue
-
-            is_block = elem.name in self.p_block_tags
-            is_plain = elem.name in self.plain_text_tags
-            content = " ".join(self.extract_paragraphs(elem))
 
+            is_block = elem.name in block_tags
             if is_block:
-                body.append(self.line_separator)
+                body.append(sep)
 
-            for line in content.split(self.line_separator):
-                line = line.strip()
-                if not line:
-                    continue
-                if not (is_plain or is_block):
-                    line = "<%s>%s</%s>" % (elem.name, line, elem.name)
-                body.append(line)
-                body.append(self.line_separator)
+            if is_block or elem.name in plain_tags:
+                child = _LineLevel("", "")
+            else:
+                child = _LineLevel(f"<{elem.name}>", f"</{elem.name}>")
+            levels.append(child)
+            walk(elem, child)
+            if opened:
+                opened = 0
+                buffer.append(child.closing)
+                flush()
+            levels.pop()
 
-            if body and body[-1] == self.line_separator and not is_block:
+            if body and body[-1] == sep and not is_block:
                 body.pop()
 
         return [x.strip() for x in body if x.strip()]
 
     def contains_bad_texts(self, text: str) -> bool:
+        return self._contains_bad_texts(text, self.plan)
+
+    def _contains_bad_texts(self, text: str, plan: CleanerPlan) -> bool:
         if not text.strip():
             return True
-        if not self.bad_text_regex:
+        pattern = plan.bad_text
+        if not pattern:
             return False
-        if not hasattr(self, "__blacklist__"):
-            pattern = re.compile("|".join(["(%s)" % p for p in self.bad_text_regex]))
-            self.__blacklist__ = pattern
-        return bool(self.__blacklist__.search(text))
+        return bool(pattern.search(text))
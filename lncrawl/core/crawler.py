@@ -1,8 +1,12 @@
 import hashlib
 import logging
+import re
 from abc import abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from inspect import iscoroutinefunction
 from threading import Event
-from typing import Generator, List, Optional, Union
+from typing import Generator, Iterator, List, Optional, Union
 
 from bs4 import Tag
 
@@ -13,6 +17,19 @@ from .scraper import Scraper
 
 logger = logging.getLogger(__name__)
 
+# The chapter whose images are rewritten while its body is cleaned.
+# A context variable works for both the threads and the asyncio tasks.
+_image_chapter: ContextVar[Optional[Chapter]] = ContextVar("image_chapter", default=None)
+
+_image_tag = re.compile(r"<img\b", re.IGNORECASE)
+# images that were rewritten already, or embedded ones that never are.
+# attributes are written in sorted order by default, but not with every formatter.
+_resolved_image_tag = re.compile(
+    r'<img (?:(?:alt|src)="(?:images/)?[0-9a-f]{32}\.jpg" (?:alt|src)="(?:images/)?[0-9a-f]{32}\.jpg"|src="data:[^"]*")/>'
+)
+# the file names of the rewritten images in a chapter body
+_image_file = re.compile(r'\bsrc="images/([0-9a-f]{32}\.jpg)"')
+
 
 class Crawler(Scraper):
     """Blueprint for creating new crawlers"""
@@ -21,6 +38,7 @@ class Crawler(Scraper):
     has_manga = False
     has_mtl = False
     language = ""
+    use_http2 = False
 
     is_disabled = False
     disable_reason: Optional[str] = None
@@ -42,6 +60,7 @@ class Crawler(Scraper):
             ("lxml", "lxml-xml", "html.parser", or "html5lib") or it may be the type of markup to be used ("html", "html5", "xml").
         """
         self.cleaner = TextCleaner()
+        self.cleaner.image_handler = self.rewrite_image
 
         # Available in `search_novel` or `read_novel_info`
         self.novel_url = ""
@@ -120,32 +139,74 @@ class Crawler(Scraper):
                 return chapter.id
         return 0
 
+    @contextmanager
+    def collect_images(self, chapter: Chapter) -> Iterator[None]:
+        """Rewrites the images of the chapter while its body is being cleaned,
+        so that `extract_chapter_images` does not have to parse it again."""
+        token = _image_chapter.set(chapter)
+        try:
+            yield
+        finally:
+            _image_chapter.reset(token)
+
+    def rewrite_image(self, img: Tag, chapter: Optional[Chapter] = None) -> bool:
+        """Points the image to its file in the output, and adds it to the chapter images.
+
+        Args:
+        - img (Tag): The image tag with a `src` attribute.
+        - chapter (Chapter, optional): The chapter of the image. Default: the one being collected.
+
+        Returns:
+        - bool: True if the image was rewritten.
+        """
+        chapter = chapter or _image_chapter.get()
+        if chapter is None or get_args().ignore_images:
+            return False
+
+        src_url = img.get("src")
+        if not isinstance(src_url, str):
+            return False
+        full_url = self.absolute_url(src_url, page_url=chapter["url"])
+        if not full_url.startswith("http"):
+            return False
+
+        filename = hashlib.md5(full_url.encode()).hexdigest() + ".jpg"
+        img.attrs = {"src": "images/" + filename, "alt": filename}
+        chapter.setdefault("images", {})
+        chapter.images[filename] = full_url
+        return True
+
     def extract_chapter_images(self, chapter: Chapter) -> None:
         ignore_images = get_args().ignore_images
         if ignore_images:
             return
 
+        chapter.setdefault("images", {})
         if not chapter.body:
+            chapter.images = {}
             return
 
-        has_changes = False
-        chapter.setdefault("images", {})
-        soup = self.make_soup(chapter.body)
-        for img in soup.select("img[src]"):
-            src_url = img.get("src")
-            assert isinstance(src_url, str)
-            full_url = self.absolute_url(src_url, page_url=chapter["url"])
-            if not full_url.startswith("http"):
-                continue
-            filename = hashlib.md5(full_url.encode()).hexdigest() + ".jpg"
-            img.attrs = {"src": "images/" + filename, "alt": filename}
-            chapter.images[filename] = full_url
-            has_changes = True
-
-        if has_changes:
-            body = soup.find("body")
-            assert isinstance(body, Tag)
-            chapter.body = body.decode_contents()
+        # the images are usually rewritten already, while the body was cleaned
+        if _image_tag.search(_resolved_image_tag.sub("", chapter.body)):
+            has_changes = False
+            soup = self.make_soup(chapter.body)
+            for img in soup.select("img[src]"):
+                filename = img.get("alt")
+                if filename in chapter.images and img.get("src") == f"images/{filename}":
+                    continue
+                if self.rewrite_image(img, chapter):
+                    has_changes = True
+
+            if has_changes:
+                body = soup.find("body")
+                assert isinstance(body, Tag)
+                chapter.body = body.decode_contents()
+
+        # some of the images rewritten while cleaning are removed afterwards,
+        # e.g. inside a bad tag, or in a paragraph with a bad text
+        if chapter.images:
+            kept = set(_image_file.findall(chapter.body))
+            chapter.images = {k: v for k, v in chapter.images.items() if k in kept}
 
     def download_chapters(
         self,
@@ -153,21 +214,56 @@ class Crawler(Scraper):
         fail_fast=False,
         signal=Event(),
     ) -> Generator[Chapter, None, None]:
+        if iscoroutinefunction(self.download_chapter_body):
+            yield from self.download_chapters_async(chapters, fail_fast, signal)
+            return
+
         def _downloader(chapter: Chapter):
             chapter.body = ""
             chapter.images = {}
-            chapter.body = self.download_chapter_body(chapter)
+            with self.collect_images(chapter):
+                chapter.body = self.download_chapter_body(chapter)
             self.extract_chapter_images(chapter)
             chapter.success = bool(chapter.body)
             return chapter
 
-        futures = [
-            self.executor.submit(_downloader, chapter)
-            for chapter in chapters
-        ]
+        yield from self.map_as_generator(
+            _downloader,
+            chapters,
+            desc="Chapters",
+            unit="item",
+            fail_fast=fail_fast,
+            signal=signal,
+        )
+
+    def download_chapters_async(
+        self,
+        chapters: List[Chapter],
+        fail_fast=False,
+        signal=Event(),
+    ) -> Generator[Chapter, None, None]:
+        """Download chapters in the asyncio engine.
+
+        It is used when `download_chapter_body` is a coroutine function, e.g.:
+
+            async def download_chapter_body(self, chapter):
+                soup = await self.async_scraper.get_soup(chapter.url)
+                return self.cleaner.extract_contents(soup.select_one("#content"))
+        """
+        async def _downloader(chapter: Chapter):
+            chapter.body = ""
+            chapter.images = {}
+            with self.collect_images(chapter):
+                chapter.body = await self.download_chapter_body(chapter)  # type:ignore
+            self.extract_chapter_images(chapter)
+            chapter.success = bool(chapter.body)
+            return chapter
 
-        yield from self.resolve_as_generator(
-            futures,
+        yield from self.map_as_generator(
+            _downloader,
+            chapters,
+            window=self.async_scraper.max_connections,
+            submit=self.async_scraper.submit,
             desc="Chapters",
             unit="item",
             fail_fast=fail_fast,
@@ -3,6 +3,7 @@ To download chapter images
 """
 
 import logging
+import re
 from concurrent.futures import Future
 from pathlib import Path
 from threading import Event
@@ -19,18 +20,8 @@ def fetch_chapter_images(app, signal=Event()):
 
     def _fetch_content_image(url: str, image_file: Path):
         assert app.crawler
-        img = app.crawler.download_image(url)
-        try:
-            if img.mode not in ("L", "RGB", "YCbCr", "RGBX"):
-                if img.mode == "RGBa":
-                    img = img.convert("RGBA").convert("RGB")
-                else:
-                    img = img.convert("RGB")
-            image_file.parent.mkdir(parents=True, exist_ok=True)
-            img.save(image_file.as_posix(), "JPEG", optimized=True)
-        finally:
-            img.close()
-
+        image_file.parent.mkdir(parents=True, exist_ok=True)
+        app.crawler.save_image(url, image_file.as_posix())
         logger.debug("Saved image: %s", image_file)
 
     def _fetch_cover_image(cover_url: str):
@@ -99,12 +90,9 @@ def fetch_chapter_images(app, signal=Event()):
         if not failed_images:
             continue
 
-        soup = app.crawler.make_soup(chapter["body"])
-        if not soup.body:
-            continue
-
+        # the image tags were written by the crawler, so there is no need to parse the body
+        body = chapter["body"] or ""
         for filename in failed_images:
             images.pop(filename)
-            for img in soup.select(f'img[alt="{filename}"]'):
-                img.extract()
-        chapter["body"] = soup.body.decode_contents()
+            body = re.sub(rf'<img\b[^>]*\balt="{re.escape(filename)}"[^>]*>', "", body)
+        chapter["body"] = body
@@ -2,7 +2,8 @@ from urllib.error import URLError
 
 from ..cloudscraper.exceptions import CloudflareException
 from PIL import UnidentifiedImageError
-from requests.exceptions import RequestException
+from requests.exceptions import (ConnectionError, ProxyError,
+                                 RequestException, Timeout)
 from urllib3.exceptions import HTTPError
 
 
@@ -14,6 +15,11 @@ class FallbackToBrowser(Exception):
     pass
 
 
+class CircuitOpenError(LNException):
+    """Raised without sending a request, while the circuit of the host is open"""
+    pass
+
+
 ScraperErrorGroup = (
     URLError,
     HTTPError,
@@ -30,3 +36,13 @@ RetryErrorGroup = (
     RequestException,
     UnidentifiedImageError,
 )
+
+
+def is_host_failure(e: BaseException) -> bool:
+    """Whether the error means the host is down, as opposed to refusing us"""
+    response = getattr(e, "response", None)
+    if response is not None:
+        return response.status_code >= 500
+    if isinstance(e, ProxyError):
+        return False  # the proxy is at fault, not the host
+    return isinstance(e, (ConnectionError, Timeout))
@@ -0,0 +1,315 @@
+import hashlib
+import json
+import logging
+import os
+import time
+import zlib
+from datetime import timedelta
+from threading import Lock, get_ident
+from typing import Any, Dict, Mapping, Optional
+from urllib.parse import urlparse
+
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+
+from .. import constants as C
+
+logger = logging.getLogger(__name__)
+
+# Only these content types are worth keeping
+CACHEABLE_CONTENT_TYPES = ("text/", "application/json", "application/xml", "application/xhtml+xml")
+
+# Headers of the origin response to keep with the body
+STORED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Date")
+
+# Request headers that identify the user. Responses are kept apart for each value.
+PRIVATE_REQUEST_HEADERS = ("Authorization", "Proxy-Authorization", "Cookie")
+
+# Fraction of max_size to shrink down to when evicting
+EVICT_TARGET = 0.9
+
+
+class HttpCache:
+    def __init__(
+        self,
+        path: str,
+        ttl: float = 3600,
+        max_size: int = 256 * 1024 * 1024,
+        host_ttl: Optional[Dict[str, float]] = None,
+    ) -> None:
+        """A disk-backed HTTP cache for GET responses.
+
+        Bodies are stored zlib compressed along with a small JSON metadata file.
+        A fresh entry is served without any request. A stale entry with an ETag
+        or Last-Modified is revalidated with a conditional request, and a 304
+        response is served from the cache.
+
+        Entries are keyed by the url and the credentials of the request, i.e. its
+        Cookie and Authorization headers, so a page fetched by a logged in user
+        is never served to anyone else. The request headers named by the Vary
+        header of the response have to match as well. The least recently used entries are
+        removed once the cache grows beyond `max_size` bytes.
+
+        Args:
+        - path (str): The cache folder.
+        - ttl (float, optional): Seconds an entry is considered fresh. Default: 3600.
+        - max_size (int, optional): Maximum total size of the bodies in bytes. Default: 256MB.
+        - host_ttl (Dict[str, float], optional): TTL overrides per hostname.
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_size = max_size
+        self.host_ttl = host_ttl or {}
+        self._lock = Lock()
+        self._size: Optional[int] = None
+        os.makedirs(path, exist_ok=True)
+
+    def key_of(self, url: str, request_headers: Optional[Mapping[str, str]] = None) -> str:
+        """Returns the cache key of the url requested with the given headers"""
+        data = url
+        if request_headers:
+            request_headers = CaseInsensitiveDict(request_headers)
+            for name in PRIVATE_REQUEST_HEADERS:
+                if request_headers.get(name):
+                    data += f"\n{name}: {request_headers[name]}"
+        return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+    def _file_of(self, key: str) -> str:
+        return os.path.join(self.path, key[:2], key)
+
+    def _file_of_meta(self, meta: Dict[str, Any]) -> str:
+        return self._file_of(meta.get("key") or self.key_of(meta["url"]))
+
+    def ttl_of(self, url: str) -> float:
+        hostname = urlparse(url).hostname or ""
+        for host, ttl in self.host_ttl.items():
+            if hostname == host or hostname.endswith("." + host):
+                return ttl
+        return self.ttl
+
+    def lookup(
+        self,
+        url: str,
+        request_headers: Optional[Mapping[str, str]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Returns the metadata of the cached entry of the url, if any.
+
+        Args:
+        - url (str): The url to look for.
+        - request_headers (Mapping, optional): Headers the request would be sent with.
+        """
+        file = self._file_of(self.key_of(url, request_headers))
+        try:
+            with open(file + ".json", "r", encoding="utf-8") as fp:
+                meta = json.load(fp)
+        except (OSError, ValueError):
+            return None
+        if meta.get("url") != url:
+            return None
+        vary = meta.get("vary") or {}
+        if vary:
+            request_headers = CaseInsensitiveDict(request_headers or {})
+            if any(request_headers.get(name) != value for name, value in vary.items()):
+                return None
+        if not os.path.exists(file + ".z"):
+            return None
+        return meta
+
+    def is_fresh(self, meta: Dict[str, Any]) -> bool:
+        return time.time() - meta.get("stored", 0) < self.ttl_of(meta["url"])
+
+    def validators(self, meta: Dict[str, Any]) -> Dict[str, str]:
+        """Returns the conditional request headers to revalidate the entry"""
+        headers = {}
+        stored = CaseInsensitiveDict(meta.get("headers") or {})
+        if stored.get("ETag"):
+            headers["If-None-Match"] = stored["ETag"]
+        if stored.get("Last-Modified"):
+            headers["If-Modified-Since"] = stored["Last-Modified"]
+        return headers
+
+    def to_response(self, meta: Dict[str, Any]) -> Optional[Response]:
+        """Rebuilds the cached response, or None if the body is gone"""
+        file = self._file_of_meta(meta)
+        try:
+            with open(file + ".z", "rb") as fp:
+                content = zlib.decompress(fp.read())
+            os.utime(file + ".z")  # keep track of recent use for eviction
+        except (OSError, zlib.error):
+            return None
+
+        response = Response()
+        response.status_code = meta.get("status", 200)
+        response.reason = "OK"
+        response.url = meta["url"]
+        response.headers = CaseInsensitiveDict(meta.get("headers") or {})
+        response.encoding = meta.get("encoding")
+        response.elapsed = timedelta(0)
+        response._content = content
+        setattr(response, "from_cache", True)
+        return response
+
+    def revalidated(self, meta: Dict[str, Any], response: Response) -> Optional[Response]:
+        """Serves the entry after the origin responded 304 Not Modified"""
+        meta = dict(meta, stored=time.time(), headers=dict(meta.get("headers") or {}))
+        for name in ("ETag", "Last-Modified", "Date"):
+            if response.headers.get(name):
+                meta["headers"][name] = response.headers[name]
+        try:
+            self._write_meta(meta)
+        except OSError as e:
+            logger.debug(f"Failed to refresh cache of {meta['url']}: {e}")
+        return self.to_response(meta)
+
+    def is_cacheable(self, response: Response) -> bool:
+        if response.status_code != 200:
+            return False
+        if "no-store" in response.headers.get("Cache-Control", ""):
+            return False
+        if response.headers.get("Vary", "").strip() == "*":
+            return False
+        content_type = response.headers.get("Content-Type", "").lower()
+        return content_type.startswith(CACHEABLE_CONTENT_TYPES)
+
+    def store(
+        self,
+        url: str,
+        response: Response,
+        request_headers: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        """Saves the response of the url requested with the given headers"""
+        if not self.is_cacheable(response):
+            return
+        self.put(
+            url,
+            response.content,
+            headers={
+                name: response.headers[name]
+                for name in STORED_HEADERS
+                if name in response.headers
+            },
+            encoding=response.encoding,
+            request_headers=request_headers,
+            vary=response.headers.get("Vary"),
+        )
+
+    def put(
+        self,
+        url: str,
+        content: bytes,
+        headers: Optional[Dict[str, str]] = None,
+        encoding: Optional[str] = None,
+        request_headers: Optional[Mapping[str, str]] = None,
+        vary: Optional[str] = None,
+    ) -> None:
+        """Saves a body that was not fetched directly, e.g. through a render proxy"""
+        key = self.key_of(url, request_headers)
+        file = self._file_of(key)
+        data = zlib.compress(content)
+        request_headers = CaseInsensitiveDict(request_headers or {})
+        meta = {
+            "url": url,
+            "key": key,
+            "status": 200,
+            "encoding": encoding,
+            "stored": time.time(),
+            "headers": headers or {},
+            "vary": {
+                name: request_headers.get(name)
+                for name in (x.strip() for x in (vary or "").split(","))
+                if name and name.lower() != "accept-encoding"
+            },
+        }
+        try:
+            os.makedirs(os.path.dirname(file), exist_ok=True)
+            old_size = os.path.getsize(file + ".z") if os.path.exists(file + ".z") else 0
+            # write to a temporary file first, so readers never see a partial body
+            tmp_file = f"{file}.{os.getpid()}.{get_ident()}.tmp"
+            with open(tmp_file, "wb") as fp:
+                fp.write(data)
+            os.replace(tmp_file, file + ".z")
+            self._write_meta(meta)
+        except OSError as e:
+            logger.debug(f"Failed to cache {url}: {e}")
+            return
+        self._grow(len(data) - old_size)
+
+    def _write_meta(self, meta: Dict[str, Any]) -> None:
+        file = self._file_of_meta(meta)
+        tmp_file = f"{file}.{os.getpid()}.{get_ident()}.json.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as fp:
+            json.dump(meta, fp)
+        os.replace(tmp_file, file + ".json")
+
+    def _grow(self, delta: int) -> None:
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._scan())
+            else:
+                self._size += delta
+            if self._size <= self.max_size:
+                return
+            self._size = self._evict(int(self.max_size * EVICT_TARGET))
+
+    def _scan(self):
+        for folder in os.scandir(self.path):
+            if not folder.is_dir():
+                continue
+            for entry in os.scandir(folder.path):
+                if entry.name.endswith(".z"):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    yield entry.path, stat.st_size, stat.st_mtime
+
+    def _evict(self, target: int) -> int:
+        entries = sorted(self._scan(), key=lambda x: x[2])
+        size = sum(x[1] for x in entries)
+        for body_file, body_size, _ in entries:
+            if size <= target:
+                break
+            for file in (body_file, body_file[:-2] + ".json"):
+                try:
+                    os.remove(file)
+                except OSError:
+                    pass
+            size -= body_size
+        logger.debug(f"HTTP cache evicted down to {size} bytes")
+        return size
+
+
+_cache_lock = Lock()
+_cache: Optional[HttpCache] = None
+
+
+def _parse_host_ttl(value: str) -> Dict[str, float]:
+    result = {}
+    for item in value.split(","):
+        host, _, ttl = item.partition("=")
+        if host.strip() and ttl.strip():
+            result[host.strip().lower()] = float(ttl)
+    return result
+
+
+def get_http_cache() -> Optional[HttpCache]:
+    """Returns the process-wide HTTP cache if it is enabled.
+
+    It is configured by these environment variables:
+    - HTTP_CACHE: Set to 1 to enable the cache.
+    - HTTP_CACHE_PATH: The cache folder. Default: CACHE_PATH/http.
+    - HTTP_CACHE_TTL: Seconds an entry is fresh. Default: 3600.
+    - HTTP_CACHE_HOST_TTL: Per host TTL, e.g. "fanmtl.com=86400,example.com=0".
+    - HTTP_CACHE_SIZE: Maximum size in MB. Default: 256.
+    """
+    global _cache
+    if _cache is None and os.getenv("HTTP_CACHE", "").lower() in ("1", "true", "yes"):
+        with _cache_lock:
+            if _cache is None:
+                _cache = HttpCache(
+                    path=os.getenv("HTTP_CACHE_PATH") or os.path.join(C.DEFAULT_CACHE_PATH, "http"),
+                    ttl=float(os.getenv("HTTP_CACHE_TTL", "3600")),
+                    max_size=int(float(os.getenv("HTTP_CACHE_SIZE", "256")) * 1024 * 1024),
+                    host_ttl=_parse_host_ttl(os.getenv("HTTP_CACHE_HOST_TTL", "")),
+                )
+    return _cache
@@ -1,10 +1,12 @@
 import atexit
+import heapq
 import logging
 import os
 import random
 import time
-from threading import Thread
-from typing import Dict, List
+from collections import OrderedDict
+from threading import Condition, Thread
+from typing import Any, Dict, List, Optional, Tuple
 
 from bs4 import BeautifulSoup
 from requests import RequestException, Session
@@ -19,11 +21,183 @@ __proxy_ttl = 3600
 __max_use_per_proxy = 50
 
 __sess = Session()
-__proxy_list: Dict[str, List[str]] = {}
 __proxy_visited_at: Dict[str, int] = {}
-__proxy_use_count: Dict[str, int] = {}
-__circular_index: Dict[str, int] = {}
-__is_private_proxy: Dict[str, bool] = {}
+
+
+class _ProxyEntry(object):
+    __slots__ = ("url", "scheme", "private", "expires", "uses", "successes", "failures", "latency")
+
+    def __init__(self, url: str, scheme: str, private: bool, expires: float) -> None:
+        self.url = url
+        self.scheme = scheme
+        self.private = private
+        self.expires = expires
+        self.uses = 0
+        self.successes = 0
+        self.failures = 0
+        self.latency: Optional[float] = None
+
+    @property
+    def score(self) -> float:
+        # smoothed success rate per second of latency; unmeasured proxies look average
+        success_rate = (self.successes + 1) / (self.successes + self.failures + 2)
+        return success_rate / ((self.latency or 1.0) + 0.1)
+
+
+class ProxyPool(object):
+    """A thread-safe pool of proxies grouped by scheme.
+
+    A proxy is picked in constant time by comparing two random proxies and
+    taking the healthier one, so fast and reliable proxies carry most of the
+    load without starving the rest. Public proxies expire after `ttl` seconds
+    or `max_uses` picks; private proxies are kept until removed. A public
+    proxy that was removed can not be added back for another `ttl` seconds.
+
+    Args:
+    - ttl (float, optional): Seconds to keep a public proxy. Default: 3600.
+    - max_uses (int, optional): Picks allowed per public proxy. Default: 50.
+    - latency_weight (float, optional): Weight of a new latency sample. Default: 0.3.
+    """
+
+    def __init__(self, ttl: float = 3600, max_uses: int = 50, latency_weight: float = 0.3) -> None:
+        self.ttl = ttl
+        self.max_uses = max_uses
+        self.latency_weight = latency_weight
+        self._lock = Condition()
+        self._entries: Dict[str, _ProxyEntry] = {}
+        self._lists: Dict[str, List[str]] = {}
+        self._index: Dict[str, int] = {}
+        self._expiry: List[Tuple[float, str]] = []
+        # retired proxies by the time they may be added again, oldest first
+        self._retired: "OrderedDict[str, float]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, url: str, scheme: str, private: bool = False) -> bool:
+        """Adds a proxy; returns False if it was used up or removed before"""
+        with self._lock:
+            self._expire()
+            if not private and self._is_retired(url):
+                return False
+            expires = float("inf") if private else time.monotonic() + self.ttl
+            entry = self._entries.get(url)
+            if entry:
+                entry.expires = expires
+            else:
+                self._entries[url] = _ProxyEntry(url, scheme, private, expires)
+                items = self._lists.setdefault(scheme, [])
+                self._index[url] = len(items)
+                items.append(url)
+            if not private:
+                heapq.heappush(self._expiry, (expires, url))
+            self._lock.notify_all()
+            return True
+
+    def remove(self, url: str) -> None:
+        with self._lock:
+            self._remove(url)
+
+    def _remove(self, url: str) -> None:
+        entry = self._entries.pop(url, None)
+        if not entry:
+            return
+        if not entry.private:
+            self._retired[url] = time.monotonic() + self.ttl
+            self._retired.move_to_end(url)
+        # swap with the last item to remove in constant time
+        items = self._lists[entry.scheme]
+        i = self._index.pop(url)
+        last = items.pop()
+        if last != url:
+            items[i] = last
+            self._index[last] = i
+
+    def _is_retired(self, url: str) -> bool:
+        return self._retired.get(url, 0) > time.monotonic()
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        while self._retired and next(iter(self._retired.values())) <= now:
+            self._retired.popitem(last=False)
+        while self._expiry and self._expiry[0][0] <= now:
+            expires, url = heapq.heappop(self._expiry)
+            entry = self._entries.get(url)
+            if entry and entry.expires == expires:
+                self._remove(url)
+
+    def acquire(self, scheme: str) -> Optional[str]:
+        """Picks a proxy of the scheme, or returns None if there is none"""
+        with self._lock:
+            self._expire()
+            items = self._lists.get(scheme)
+            if not items:
+                return None
+            entry = self._entries[random.choice(items)]
+            if len(items) > 1:
+                other = self._entries[random.choice(items)]
+                if other.score > entry.score:
+                    entry = other
+            entry.uses += 1
+            if not entry.private and entry.uses >= self.max_uses:
+                self._remove(entry.url)
+            return entry.url
+
+    def report(self, url: str, success: bool, latency: Optional[float] = None) -> None:
+        """Records the outcome of a request sent through the proxy"""
+        with self._lock:
+            entry = self._entries.get(url)
+            if not entry:
+                return
+            if success:
+                entry.successes += 1
+            else:
+                entry.failures += 1
+            if latency is not None:
+                if entry.latency is None:
+                    entry.latency = latency
+                else:
+                    entry.latency += self.latency_weight * (latency - entry.latency)
+
+    def is_retired(self, url: str) -> bool:
+        with self._lock:
+            return self._is_retired(url)
+
+    def is_private(self, url: str) -> bool:
+        entry = self._entries.get(url)
+        return bool(entry and entry.private)
+
+    def wait(self, scheme: Optional[str] = None, timeout: Optional[float] = None) -> bool:
+        """Waits until a proxy of the scheme, or of any scheme, is available"""
+        def _available():
+            if scheme:
+                return bool(self._lists.get(scheme))
+            return any(self._lists.values())
+
+        with self._lock:
+            return self._lock.wait_for(_available, timeout)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Returns the usage of every proxy in the pool, busiest first"""
+        with self._lock:
+            result = [
+                {
+                    "url": x.url,
+                    "scheme": x.scheme,
+                    "private": x.private,
+                    "uses": x.uses,
+                    "successes": x.successes,
+                    "failures": x.failures,
+                    "latency": x.latency,
+                    "score": x.score,
+                }
+                for x in self._entries.values()
+            ]
+        result.sort(key=lambda x: x["uses"], reverse=True)
+        return result
+
+
+__pool = ProxyPool(ttl=__proxy_ttl, max_uses=__max_use_per_proxy)
 
 
 def load_proxies(proxy_file: str):
@@ -41,59 +215,43 @@ def load_proxies(proxy_file: str):
             schemes = ["http", "https"]
 
         for scheme in schemes:
-            __proxy_list.setdefault(scheme, [])
-            url = scheme + "://" + address
-            __proxy_list[scheme].append(url)
-            __is_private_proxy[url] = True
+            __pool.add(scheme + "://" + address, scheme, private=True)
 
 
 def get_a_proxy(scheme: str = "http", timeout: float = 0):
     if timeout > 0:
         wait_for_first_proxy(scheme, timeout)
+    return __pool.acquire(scheme)
 
-    proxy_list = __proxy_list.get(scheme)
-    if isinstance(proxy_list, list) and not __has_exit:
-        proxy_list = [
-            url
-            for url in proxy_list
-            if __proxy_visited_at[url] + __proxy_ttl > time.time()
-            and __proxy_use_count.get(url, 0) < __max_use_per_proxy
-        ]
-        __proxy_list[scheme] = proxy_list
 
-    if not proxy_list:
-        return
+def remove_faulty_proxies(faulty_url: str):
+    if faulty_url and not __pool.is_private(faulty_url):
+        __pool.remove(faulty_url)
 
-    __circular_index.setdefault(scheme, -1)
-    __circular_index[scheme] += 1
-    __circular_index[scheme] %= len(proxy_list)
 
-    url = proxy_list[__circular_index[scheme]]
-    __proxy_use_count[url] = __proxy_use_count.get(url, 0) + 1
-    return url
+def report_proxy_result(url: str, success: bool, latency: Optional[float] = None):
+    if url:
+        __pool.report(url, success, latency)
 
 
-def remove_faulty_proxies(faulty_url: str):
-    if faulty_url and not __is_private_proxy[faulty_url]:
-        __proxy_use_count[faulty_url] = __max_use_per_proxy + 1
+def get_proxy_stats() -> List[Dict[str, Any]]:
+    return __pool.stats()
 
 
 def wait_for_first_proxy(scheme: str, timeout: float = 0):
     if timeout <= 0:
         timeout = 10 * 60
 
-    elapsed: float = 0
-    while not __has_exit and elapsed < timeout:
-        for k, v in __proxy_list.items():
-            if v and (not scheme or k == scheme):
-                return True
-        time.sleep(0.1)
-        elapsed += 0.1
+    deadline = time.time() + timeout
+    while not __has_exit and time.time() < deadline:
+        # wake up now and then to notice when the fetcher stops
+        if __pool.wait(scheme, min(1, deadline - time.time())):
+            return True
 
 
 def __validate_and_add(scheme: str, ip: str, url: str):
     try:
-        if __proxy_use_count.get(url, 0) >= __max_use_per_proxy:
+        if __pool.is_retired(url):
             return
 
         with no_ssl_verification():
@@ -106,8 +264,7 @@ def __validate_and_add(scheme: str, ip: str, url: str):
             resp.raise_for_status()
         if resp.text.strip() == ip:
             # print('>>>>>> found', url)
-            __proxy_list[scheme].append(url)
-            return True
+            return __pool.add(url, scheme)
     except RequestException:
         # print(url, e)
         pass
@@ -152,7 +309,6 @@ def __find_proxies():
                 scheme = "https" if cols[6] == "yes" else "http"
                 url = f"{scheme}://{ip}:{port}"
 
-                __proxy_list.setdefault(scheme, [])
                 if __proxy_visited_at.get(url, 0) + __proxy_ttl < time.time():
                     __validate_and_add(scheme, ip, url)
                     __proxy_visited_at[url] = int(time.time())
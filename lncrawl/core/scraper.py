@@ -1,29 +1,110 @@
 import base64
+import copy
 import logging
 import os
 import re
+import tempfile
+import time
 from io import BytesIO
-from typing import Any, Callable, Dict, MutableMapping, Optional, Tuple, Union
+from threading import get_ident
+from typing import (TYPE_CHECKING, Any, Callable, Dict, List,
+                    MutableMapping, Optional, Tuple, Union)
 from urllib.parse import ParseResult, urlparse
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, Tag
+from .. import constants as C
 from ..cloudscraper import create_scraper
+from ..cloudscraper.clearance import get_clearance_store
 from PIL import Image, UnidentifiedImageError
-from requests import Response, Session
-from requests.exceptions import ProxyError
+from requests import Request, Response, Session
+from requests.cookies import get_cookie_header
+from requests.exceptions import (ChunkedEncodingError, ConnectionError,
+                                 ProxyError, Timeout)
 from requests.structures import CaseInsensitiveDict
-from tenacity import (RetryCallState, retry, retry_if_exception_type,
-                      stop_after_attempt, wait_random_exponential)
-
-from .exeptions import RetryErrorGroup
-from .proxy import get_a_proxy, remove_faulty_proxies
+from tenacity import (RetryCallState, retry, stop_after_attempt,
+                      wait_random_exponential)
+
+from ..utils.circuit import CircuitBreaker, get_circuit, retry_budget
+from ..utils.dnscache import install_dns_cache, pop_connection_timings
+from ..utils.hostgate import AdaptiveGate
+from ..utils.metrics import RequestMetrics, request_metrics
+from ..utils.singleflight import SingleFlight
+from .cassette import get_cassette
+from .exeptions import (CircuitOpenError, LNException, RetryErrorGroup,
+                        is_host_failure)
+from .httpcache import get_http_cache
+from .proxy import get_a_proxy, remove_faulty_proxies, report_proxy_result
 from .soup import SoupMaker
 from .taskman import TaskManager
 
+if TYPE_CHECKING:
+    from .async_scraper import AsyncScraper
+
 logger = logging.getLogger(__name__)
 
+# New connections look up the hosts in a process-wide DNS cache
+install_dns_cache()
+
+# Downloads of the same image into the same file at the same time are done
+# once, e.g. a cover or an image shared by chapters
+_image_flights = SingleFlight()
+
+# Request headers that make two requests for the same url different
+COALESCE_KEY_HEADERS = ("Accept", "Accept-Language", "Range")
+
+# Requests carrying any of these headers are never coalesced
+PRIVATE_HEADERS = ("Authorization", "Proxy-Authorization", "Cookie")
+
+IMAGE_ACCEPT = "image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.9"
+IMAGE_CHUNK_SIZE = 64 * 1024
+MAX_IMAGE_SIZE = int(float(os.getenv("IMAGE_SIZE_LIMIT_IN_MB", "32")) * 1024 * 1024)
+
+# Errors raised by iter_content while reading the body of a streamed image.
+# A read timeout is raised as a ConnectionError there. Only the ones raised
+# after the response has left __process_request retry the whole download;
+# that one retries the errors before the body itself.
+IMAGE_BODY_ERRORS = (ChunkedEncodingError, ConnectionError)
+
+# Image modes that can be saved as JPEG without a conversion
+JPEG_MODES = ("L", "RGB", "YCbCr", "RGBX")
+
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "JPEG"),
+    (b"\x89PNG\r\n\x1a\n", "PNG"),
+    (b"GIF87a", "GIF"),
+    (b"GIF89a", "GIF"),
+    (b"BM", "BMP"),
+    (b"II*\x00", "TIFF"),
+    (b"MM\x00*", "TIFF"),
+    (b"\x00\x00\x01\x00", "ICO"),
+)
+
+
+def sniff_image_format(head: bytes) -> Optional[str]:
+    """Guesses the image format from the first bytes of the file"""
+    for signature, name in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return name
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "WEBP"
+    if head[4:8] == b"ftyp":
+        return "AVIF" if head[8:12] in (b"avif", b"avis") else "HEIF"
+    return None
+
+
+def save_as_jpeg(img: Image.Image, output_file: str) -> None:
+    if img.mode not in JPEG_MODES:
+        if img.mode == "RGBa":
+            img = img.convert("RGBA").convert("RGB")
+        else:
+            img = img.convert("RGB")
+    img.save(output_file, "JPEG", optimized=True)
+
 
 class Scraper(TaskManager, SoupMaker):
+    # Multiplex https requests over HTTP/2 connections
+    use_http2 = False
+
     def __init__(
         self,
         origin: str,
@@ -33,6 +114,10 @@ class Scraper(TaskManager, SoupMaker):
         self.home_url = origin
         self.last_soup_url = ""
         self.use_proxy = os.getenv("use_proxy")
+        self.request_metrics = RequestMetrics(parent=request_metrics)
+        # identical requests in flight at the same time are sent only once.
+        # the table is per instance, as every instance has its own session.
+        self._inflight_requests = SingleFlight()
 
         self.init_scraper()
         self.init_parser(parser)
@@ -41,12 +126,26 @@ class Scraper(TaskManager, SoupMaker):
     def close(self) -> None:
         if hasattr(self, "scraper"):
             self.scraper.close()
+        if hasattr(self, "_async_scraper"):
+            self._async_scraper.close()
+            del self._async_scraper
         super().close()
 
+    @property
+    def async_scraper(self) -> "AsyncScraper":
+        """An asyncio engine sharing headers and cookies with this scraper.
+        It is created on first use. Requires httpx to be installed.
+        """
+        if not hasattr(self, "_async_scraper"):
+            from .async_scraper import AsyncScraper
+            self._async_scraper = AsyncScraper(self)
+        return self._async_scraper
+
     def init_parser(self, parser: Optional[str] = None):
         self._soup_tool = SoupMaker(parser)
         self.make_tag = self._soup_tool.make_tag  # type:ignore
         self.make_soup = self._soup_tool.make_soup  # type:ignore
+        self.make_region = self._soup_tool.make_region  # type:ignore
 
     def init_scraper(self, session: Optional[Session] = None):
         try:
@@ -61,6 +160,14 @@ class Scraper(TaskManager, SoupMaker):
                 rotate_tls_ciphers=True,       
                 session_refresh_interval=900,  
 
+                # [CRITICAL SPEED HACK]
+                # Boost cloudscraper internal pool size
+                pool_connections=100,
+                pool_maxsize=100,
+
+                # Share Cloudflare clearance with other crawlers and processes
+                clearance_store=get_clearance_store(C.CLEARANCE_STORE_FILE),
+
                 enable_stealth=True,
                 stealth_options={
                     'min_delay': 0,            
@@ -77,18 +184,30 @@ class Scraper(TaskManager, SoupMaker):
                     'mobile': False,
                 },
             )
-            
-            # [CRITICAL SPEED HACK]
-            # Boost cloudscraper internal pool size
-            if hasattr(self.scraper, 'adapters'):
-                for adapter in self.scraper.adapters.values():
-                    adapter.pool_connections = 100
-                    adapter.pool_maxsize = 100
-                    
         except Exception:
             logger.exception("Failed to initialize cloudscraper")
             self.scraper = session or Session()
 
+        if self.use_http2:
+            self.init_http2()
+
+        cassette = get_cassette()
+        if cassette:
+            cassette.mount(self.scraper)
+
+    def init_http2(self) -> None:
+        """Sends https requests over multiplexed HTTP/2 connections.
+        Requires httpx with the http2 extra to be installed.
+        """
+        try:
+            import h2  # noqa: F401
+            from .transport import Http2Adapter
+        except ImportError as e:
+            logger.warning(f"HTTP/2 is not available: {e}")
+            return
+        adapter = Http2Adapter(ciphers=getattr(self.scraper, "cipherSuite", None))
+        self.scraper.mount("https://", adapter)
+
     def __get_proxies(self, scheme, timeout: float = 0):
         if self.use_proxy and scheme:
             return {scheme: get_a_proxy(scheme, timeout)}
@@ -117,48 +236,196 @@ class Scraper(TaskManager, SoupMaker):
         headers.setdefault("Origin", self.home_url.strip("/"))
         headers.setdefault("Referer", self.last_soup_url or self.home_url)
 
+        cache = None
+        cached = None
+        cache_headers = None
+        if method == "get" and not kwargs.get("stream"):
+            cache = get_http_cache()
+        if cache:
+            # responses are cached apart for the credentials of each session
+            cache_headers = self.__session_headers(url, headers)
+            cached = cache.lookup(url, cache_headers)
+        if cache and cached:
+            if cache.is_fresh(cached):
+                response = cache.to_response(cached)
+                if response:
+                    logger.debug(f"[CACHED] {url}")
+                    return response
+            for key, value in cache.validators(cached).items():
+                headers.setdefault(key, value)
+
         def _after_retry(retry_state: RetryCallState):
             future = retry_state.outcome
             if future:
                 e = future.exception()
                 if isinstance(e, RetryErrorGroup):
                     logger.debug(f"{repr(e)} | Retrying...")
+                    self.request_metrics.record_retry(_parsed.hostname)
                     if isinstance(e, ProxyError):
                         for proxy_url in kwargs.get("proxies", {}).values():
                             remove_faulty_proxies(proxy_url)
                         kwargs["proxies"] = self.__get_proxies(_parsed.scheme, 5)
 
+        def _should_retry(retry_state: RetryCallState) -> bool:
+            future = retry_state.outcome
+            if not future or not isinstance(future.exception(), RetryErrorGroup):
+                return False
+            if retry_state.attempt_number >= (max_retries or 0):
+                return False  # last attempt; do not spend the budget
+            return retry_budget.try_retry()
+
+        circuit = get_circuit(_parsed.hostname)
+
         @retry(
             stop=stop_after_attempt(max_retries or 0),
             wait=wait_random_exponential(multiplier=0.5, max=60),
-            retry=retry_if_exception_type(RetryErrorGroup),
+            retry=_should_retry,
             after=_after_retry,
             reraise=True,
         )
         def _do_request():
-            with self.domain_gate(_parsed.hostname):
-                response = method_call(
-                    url,
-                    *args,
-                    **kwargs,
-                    headers=headers,
-                )
-                response.raise_for_status()
-                response.encoding = "utf8"
+            if not circuit.allow():
+                raise CircuitOpenError(f"Circuit is open for {_parsed.hostname}")
+            retry_budget.record_request()
+            proxy_urls = [x for x in kwargs.get("proxies", {}).values() if x]
+            gate = self.domain_gate(_parsed.hostname)
+            pop_connection_timings()  # forget connections of earlier requests
+            started = time.monotonic()
+            try:
+                with gate:
+                    start = time.monotonic()
+                    response = method_call(
+                        url,
+                        *args,
+                        **kwargs,
+                        headers=headers,
+                    )
+                    elapsed = time.monotonic() - start
+                    response.raise_for_status()
+                    response.encoding = "utf8"
+            except Exception as e:
+                if is_host_failure(e):
+                    circuit.record_failure()
+                else:
+                    circuit.record_neutral()
+                # errors of the origin, like a 404, are not the proxy's fault
+                if isinstance(e, (ConnectionError, Timeout)):
+                    for proxy_url in proxy_urls:
+                        report_proxy_result(proxy_url, False)
+                self.__record_metrics(_parsed.hostname, started, gate, error=e)
+                raise
+            circuit.record_success()
+            self.__record_metrics(_parsed.hostname, started, gate, response=response)
+            for proxy_url in proxy_urls:
+                report_proxy_result(proxy_url, True, elapsed)
 
             self.cookies.update({x.name: x.value for x in response.cookies})
+            if cache:
+                if cached and response.status_code == 304:
+                    return cache.revalidated(cached, response) or response
+                cache.store(url, response, cache_headers)
             return response
 
         logger.debug(
             f"[{method.upper()}] {url}\n"
             + "\n".join([f"    {k} = {v}" for k, v in kwargs.items()])
         )
-        return _do_request()
+        key = self.__coalesce_key(method, url, headers, kwargs)
+        if not key:
+            return _do_request()
+
+        response, shared = self._inflight_requests.do(key, _do_request)
+        if shared:
+            logger.debug(f"[SHARED] {url}")
+            # the follower gets its own response object over the same bytes
+            response = copy.copy(response)
+        return response
+
+    def __session_headers(self, url: str, headers: MutableMapping) -> CaseInsensitiveDict:
+        """The headers the session would send with a request, including its cookies"""
+        result = CaseInsensitiveDict(self.scraper.headers)
+        result.update(headers)
+        if "Cookie" not in result:
+            cookie = get_cookie_header(self.scraper.cookies, Request("GET", url, headers=result))
+            if cookie:
+                result["Cookie"] = cookie
+        return result
+
+    def __record_metrics(
+        self,
+        hostname: Optional[str],
+        started: float,
+        gate: AdaptiveGate,
+        response: Optional[Response] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        if response is None and error is not None:
+            response = getattr(error, "response", None)
+
+        timings = pop_connection_timings()
+        throttle_wait = getattr(self.scraper, "throttle_wait", None)
+        values: Dict[str, Optional[float]] = {
+            "gate_wait": gate.last_wait,
+            "throttle_wait": throttle_wait,
+            "dns": timings.get("dns"),
+            "connect": timings.get("connect"),
+            "total": time.monotonic() - started,
+        }
+        if response is not None:
+            # requests measures the time to the headers, including the new connection
+            elapsed = response.elapsed.total_seconds()
+            values["ttfb"] = max(0, elapsed - (values["dns"] or 0) - (values["connect"] or 0))
+            if response._content_consumed and isinstance(response._content, bytes):
+                values["bytes_in"] = len(response._content)
+                values["download"] = max(
+                    0, values["total"] - gate.last_wait - (throttle_wait or 0) - elapsed
+                )
+            request = response.request
+            if request is not None:
+                body = request.body or b""
+                values["bytes_out"] = len(body) + sum(
+                    len(str(k)) + len(str(v)) + 4 for k, v in request.headers.items()
+                )
+
+        self.request_metrics.record(
+            hostname,
+            status=response.status_code if response is not None else None,
+            error=error,
+            **values,
+        )
+
+    def __coalesce_key(
+        self,
+        method: str,
+        url: str,
+        headers: MutableMapping,
+        kwargs: Dict[str, Any],
+    ) -> Optional[tuple]:
+        if method not in ("get", "head"):
+            return None
+        if kwargs.get("stream") or kwargs.get("data") or kwargs.get("json"):
+            return None
+        if kwargs.get("cookies") or kwargs.get("auth"):
+            return None
+        if any(headers.get(name) for name in PRIVATE_HEADERS):
+            return None
+        params = kwargs.get("params")
+        return (
+            method,
+            url,
+            repr(sorted(params.items())) if isinstance(params, dict) else repr(params),
+            tuple(headers.get(name) for name in COALESCE_KEY_HEADERS),
+        )
 
     @property
     def origin(self) -> ParseResult:
         return urlparse(self.home_url)
 
+    @property
+    def circuit(self) -> CircuitBreaker:
+        """The circuit breaker of the host of the home url"""
+        return get_circuit(self.origin.hostname)
+
     @property
     def headers(self) -> Dict[str, Union[str, bytes]]:
         return dict(self.scraper.headers)
@@ -252,40 +519,155 @@ class Scraper(TaskManager, SoupMaker):
         with open(output_file, "wb") as f:
             f.write(response.content)
 
-    def download_image(
+    def fetch_image(
         self,
         url: str,
+        output_file: str,
         headers: Optional[MutableMapping] = {},
+        max_size: Optional[int] = None,
         **kwargs
-    ):
+    ) -> Optional[str]:
+        """Streams the image into the output file without decoding it.
+
+        The format is sniffed from the first bytes, so a page that is not an
+        image fails early. The download is aborted once it grows beyond
+        `max_size` bytes, or IMAGE_SIZE_LIMIT_IN_MB if not given. If the
+        connection breaks while reading the body, the download starts over.
+
+        Returns:
+            The sniffed format, e.g. "JPEG", or None if it is not known.
+        """
         if url.startswith("data:"):
             content = base64.b64decode(url.split("base64,")[-1])
-            return Image.open(BytesIO(content))
+            with open(output_file, "wb") as f:
+                f.write(content)
+            return sniff_image_format(content)
 
         headers = CaseInsensitiveDict(headers)
         headers.setdefault("Origin", None)
         headers.setdefault("Referer", None)
+        headers.setdefault("Accept", IMAGE_ACCEPT)
         timeout = kwargs.pop('timeout', None) or (3, 30)
+        max_size = max_size or MAX_IMAGE_SIZE
 
-        try:
+        hostname = urlparse(url).hostname
+        broken_bodies: List[BaseException] = []
+
+        def _should_retry(retry_state: RetryCallState) -> bool:
+            future = retry_state.outcome
+            if not future or future.exception() not in broken_bodies:
+                return False
+            if retry_state.attempt_number >= 2:
+                return False  # last attempt; do not spend the budget
+            self.request_metrics.record_retry(hostname)
+            return retry_budget.try_retry()
+
+        @retry(
+            stop=stop_after_attempt(2),
+            wait=wait_random_exponential(multiplier=0.5, max=60),
+            retry=_should_retry,
+            reraise=True,
+        )
+        def _download() -> Optional[str]:
             response = self.__process_request(
                 "get",
                 url,
                 headers=headers,
                 timeout=timeout,
                 max_retries=2,
+                stream=True,
                 **kwargs,
             )
-            content = response.content
+            with response:
+                length = response.headers.get("Content-Length", "")
+                if length.isdigit() and int(length) > max_size:
+                    raise LNException(f"Image is larger than {max_size} bytes: {url}")
+
+                head = b""
+                size = 0
+                with open(output_file, "wb") as f:
+                    try:
+                        for chunk in response.iter_content(IMAGE_CHUNK_SIZE):
+                            if len(head) < 32:
+                                head += chunk[:32]
+                                if head.lstrip()[:1] == b"<" and not sniff_image_format(head):
+                                    raise UnidentifiedImageError(f"Not an image: {url}")
+                            size += len(chunk)
+                            if size > max_size:
+                                raise LNException(f"Image is larger than {max_size} bytes: {url}")
+                            f.write(chunk)
+                    except IMAGE_BODY_ERRORS as e:
+                        broken_bodies.append(e)
+                        raise
+            return sniff_image_format(head)
+
+        return _download()
+
+    def save_image(
+        self,
+        url: str,
+        output_file: str,
+        headers: Optional[MutableMapping] = {},
+        **kwargs
+    ) -> None:
+        """Downloads the image and saves it as a JPEG file.
+
+        A JPEG image that needs no conversion is decoded once to check that it
+        is not corrupt or truncated, then moved into place as it is; anything
+        else is decoded from the downloaded file and re-encoded. Concurrent
+        calls for the same url and file share one download.
+        """
+        def _save() -> None:
+            tmp_file = f"{output_file}.{os.getpid()}.{get_ident()}.part"
+            try:
+                self.fetch_image(url, tmp_file, headers, **kwargs)
+                with Image.open(tmp_file) as img:
+                    # opening only reads the header; pixels are decoded on demand
+                    keep = img.format == "JPEG" and img.mode in JPEG_MODES
+                    if keep:
+                        img.load()
+                    else:
+                        save_as_jpeg(img, output_file)
+                if keep:
+                    os.replace(tmp_file, output_file)
+            finally:
+                if os.path.exists(tmp_file):
+                    os.remove(tmp_file)
+
+        _, shared = _image_flights.do((url, os.path.abspath(output_file)), _save)
+        if shared:
+            logger.debug(f"[SHARED] {url}")
+
+    def download_image(
+        self,
+        url: str,
+        headers: Optional[MutableMapping] = {},
+        **kwargs
+    ) -> Image.Image:
+        if url.startswith("data:"):
+            content = base64.b64decode(url.split("base64,")[-1])
             return Image.open(BytesIO(content))
-        except UnidentifiedImageError:
-            headers.setdefault(
-                "Accept",
-                "image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.9",
+
+        def _download() -> Image.Image:
+            tmp_file = os.path.join(
+                tempfile.gettempdir(),
+                f"lncrawl-image-{os.getpid()}-{get_ident()}.part",
             )
-            response = self.__process_request("get", url, headers=headers, **kwargs)
-            content = response.content
-            return Image.open(BytesIO(content))
+            try:
+                self.fetch_image(url, tmp_file, headers, **kwargs)
+                img = Image.open(tmp_file)
+                img.load()
+                return img
+            finally:
+                if os.path.exists(tmp_file):
+                    os.remove(tmp_file)
+
+        img, shared = self._inflight_requests.do(("image", url), _download)
+        if shared:
+            logger.debug(f"[SHARED] {url}")
+            # the follower gets its own image over the same pixels
+            img = img.copy()
+        return img
 
     def get_json(
         self,
@@ -359,6 +741,29 @@ class Scraper(TaskManager, SoupMaker):
         self.last_soup_url = url
         return self.make_soup(response, encoding)
 
+    def get_region(
+        self,
+        url: str,
+        selector: str,
+        headers: Optional[MutableMapping] = {},
+        encoding: Optional[str] = None,
+        **kwargs,
+    ) -> Optional[Tag]:
+        """Like `get_soup`, but only the first element matching the selector is parsed
+        into a soup. Returns None if there is no such element."""
+        headers = CaseInsensitiveDict(headers)
+        headers.setdefault(
+            "Accept",
+            "text/html,application/xhtml+xml,application/xml;q=0.9",
+        )
+        response = self.get_response(
+            url,
+            headers=headers,
+            **kwargs,
+        )
+        self.last_soup_url = url
+        return self.make_region(response, selector, encoding)
+
     def post_soup(
         self,
         url: str,
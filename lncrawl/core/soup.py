@@ -1,6 +1,7 @@
 import logging
 from abc import ABC
-from typing import Optional, Union
+from functools import lru_cache
+from typing import Any, Optional, Tuple, Union
 
 from bs4 import BeautifulSoup, Tag
 from requests import Response
@@ -13,6 +14,37 @@ logger = logging.getLogger(__name__)
 DEFAULT_PARSER = "lxml"
 
 
+@lru_cache(maxsize=256)
+def _css_selector(selector: str) -> Any:
+    from lxml.cssselect import CSSSelector
+
+    return CSSSelector(selector, translator="html")
+
+
+def _select_region(
+    data: Union[bytes, str],
+    selector: str,
+    encoding: Optional[str] = None,
+) -> Optional[Tuple[str, str]]:
+    """Returns the tag name and html of the first element matching the selector, using lxml.
+
+    Raises ImportError if cssselect is not installed, and a ValueError or an
+    lxml error if the data or the selector is not supported.
+    """
+    from lxml import html as lxml_html
+
+    match = _css_selector(selector)
+    if isinstance(data, bytes):
+        # decode like make_soup does, ignoring invalid bytes
+        data = data.decode(encoding or "utf8", "ignore")
+    root = lxml_html.document_fromstring(data)
+    elements = match(root)
+    if not elements:
+        return None
+    html = lxml_html.tostring(elements[0], encoding="unicode", with_tail=False)
+    return elements[0].tag, html
+
+
 class SoupMaker(ABC):
     def __init__(
         self,
@@ -44,6 +76,39 @@ class SoupMaker(ABC):
             raise LNException("Could not parse response")
         return BeautifulSoup(html, features=self._parser)
 
+    def make_region(
+        self,
+        data: Union[Response, bytes, str],
+        selector: str,
+        encoding: Optional[str] = None,
+    ) -> Optional[Tag]:
+        """Makes the soup of only the first element matching the selector, e.g. the
+        body of a chapter, or None if there is no such element.
+
+        The page is parsed by lxml, and only the selected element is
+        built into a soup. This is many times faster than the soup of a page full
+        of ads and scripts. Falls back to `make_soup` for other parsers, or if
+        cssselect does not support the selector.
+        """
+        if isinstance(data, Response):
+            data = data.content
+        if self._parser == DEFAULT_PARSER:
+            try:
+                region = _select_region(data, selector, encoding)
+            except ImportError:
+                logger.debug("Install cssselect to parse the regions of a page")
+            except Exception as e:
+                logger.debug(f"Parsing the whole page for '{selector}' | {e}")
+            else:
+                if region is None:
+                    return None
+                name, html = region
+                # the region is the first element of its kind in its own soup
+                tag = BeautifulSoup(html, features=self._parser).find(name)
+                if isinstance(tag, Tag):
+                    return tag
+        return self.make_soup(data, encoding).select_one(selector)
+
     def make_tag(
         self,
         data: Union[Response, bytes, str],
@@ -2,21 +2,33 @@ import atexit
 import logging
 import os
 from abc import ABC
-from concurrent.futures import Future, ThreadPoolExecutor, as_completed
-from threading import Event, Semaphore, Thread
-from typing import Any, Dict, Generator, Iterable, List, Optional
+from concurrent.futures import (FIRST_COMPLETED, Future, ThreadPoolExecutor,
+                                as_completed, wait)
+from threading import Event, Lock, Semaphore, Thread
+from typing import (Any, Callable, Dict, Generator, Iterable, Iterator, List,
+                    Optional, Set, Sized)
+from urllib.parse import urlparse
 
 from tqdm import tqdm
 
+from ..utils.hostgate import AdaptiveGate
 from ..utils.ratelimit import RateLimiter
 from .exeptions import LNException
 
 logger = logging.getLogger(__name__)
 
-MAX_REQUESTS_PER_DOMAIN = 5
+MIN_REQUESTS_PER_DOMAIN = 1
+INITIAL_REQUESTS_PER_DOMAIN = 5
+MAX_REQUESTS_PER_DOMAIN = 64
 
 _resolver = Semaphore(1)
-_host_semaphores: Dict[str, Semaphore] = {}
+_host_gates_lock = Lock()
+_host_gates: Dict[str, AdaptiveGate] = {}
+
+
+def host_gate_stats() -> Dict[str, Dict[str, Any]]:
+    """Current concurrency window of every known hostname"""
+    return {host: gate.stats() for host, gate in list(_host_gates.items())}
 
 
 class TaskManager(ABC):
@@ -43,7 +55,8 @@ class TaskManager(ABC):
 
     @property
     def futures(self) -> List[Future]:
-        return self._futures
+        """List of submitted futures which are not done yet"""
+        return list(self._futures)
 
     @property
     def workers(self):
@@ -71,14 +84,16 @@ class TaskManager(ABC):
 
         Args:
         - workers (int, optional): Number of concurrent workers to expect. Default: 5.
-        - ratelimit (float, optional): Number of requests per second.
+        - ratelimit (float, optional): Number of requests per second. It is shared by
+            all the workers, and by all instances crawling the same host.
         """
-        self._futures: List[Future] = []
+        self._futures: Dict[Future, None] = {}
         self.close()  # cleanup previous initialization
 
         if ratelimit and ratelimit > 0:
-            workers = 1  # use single worker if ratelimit is being applied
-            self._limiter = RateLimiter(ratelimit)
+            # tasks of all instances for the same host draw from one bucket
+            hostname = urlparse(getattr(self, "home_url", "")).hostname
+            self._limiter = RateLimiter(ratelimit, key=hostname)
         elif hasattr(self, "_limiter"):
             del self._limiter
 
@@ -104,9 +119,13 @@ class TaskManager(ABC):
         if not self._submit:
             raise Exception("No executor is available")
         future = self._submit(fn, *args, **kwargs)
-        self._futures.append(future)
+        self._futures[future] = None
+        future.add_done_callback(self._discard_future)
         return future
 
+    def _discard_future(self, future: Future) -> None:
+        self._futures.pop(future, None)
+
     @staticmethod
     def progress_bar(
         iterable: Optional[Iterable] = None,
@@ -144,14 +163,18 @@ class TaskManager(ABC):
         bar.close = extended_close  # type: ignore
         return bar
 
-    def domain_gate(self, hostname: Optional[str]):
+    def domain_gate(self, hostname: Optional[str]) -> AdaptiveGate:
         """Limit number of entry per hostname.
 
+        The gate is shared by all instances in the process. Its size adapts
+        to the responses of the host: it widens while the host stays healthy
+        and shrinks on 403/429/503 or rising latency.
+
         Args:
             hostname: A fully qualified url.
 
         Returns:
-            A semaphore object to wait.
+            A semaphore-like gate object to wait.
 
         Example:
             with self.domain_gate(url):
@@ -159,9 +182,19 @@ class TaskManager(ABC):
         """
         if hostname is None:
             hostname = ''
-        if hostname not in _host_semaphores:
-            _host_semaphores[hostname] = Semaphore(MAX_REQUESTS_PER_DOMAIN)
-        return _host_semaphores[hostname]
+        gate = _host_gates.get(hostname)
+        if gate is None:
+            with _host_gates_lock:
+                gate = _host_gates.setdefault(
+                    hostname,
+                    AdaptiveGate(
+                        initial=INITIAL_REQUESTS_PER_DOMAIN,
+                        minimum=MIN_REQUESTS_PER_DOMAIN,
+                        maximum=MAX_REQUESTS_PER_DOMAIN,
+                        hostname=hostname,
+                    ),
+                )
+        return gate
 
     def cancel_futures(self, futures: Iterable[Future]) -> None:
         """Cancels all the future that are not yet done.
@@ -206,7 +239,116 @@ class TaskManager(ABC):
             disable=disable_bar,
         )
         try:
-            for future in as_completed(futures):
+            yield from self._resolve_completed(
+                as_completed(futures),
+                bar=bar,
+                fail_fast=fail_fast,
+                signal=signal,
+            )
+        finally:
+            Thread(
+                target=self.cancel_futures,
+                kwargs=dict(futures=futures),
+                # daemon=True,
+            ).start()
+            bar.close()
+
+    def map_as_generator(
+        self,
+        fn: Callable[[Any], Any],
+        items: Iterable[Any],
+        total: Optional[int] = None,
+        window: Optional[int] = None,
+        disable_bar: bool = False,
+        desc: Optional[str] = None,
+        unit: Optional[str] = None,
+        fail_fast: bool = False,
+        signal=Event(),
+        submit: Optional[Callable[..., Future]] = None,
+    ) -> Generator[Any, None, None]:
+        """Submit fn(item) for each item and resolve the results as a generator.
+
+        Unlike submitting all tasks up front, only a window of tasks are kept
+        in flight. Items are pulled from the iterable as the previous tasks are
+        done, and completed futures are dropped as soon as they are yielded.
+        The memory usage is therefore bounded by the concurrency, not by the
+        number of items.
+
+        Args:
+            fn: The callable to execute for each item.
+            items: An iterable of items. It is consumed lazily.
+            total: Number of items for the progress bar. Default: len(items) if available.
+            window: Maximum number of tasks in flight. Default: twice the workers.
+            disable_bar: Hides the progress bar if True.
+            desc: The progress bar description
+            unit: The progress unit name
+            fail_fast: Fail on first error
+            submit: The function to schedule a task. Default: executor.submit
+        """
+        if total is None and isinstance(items, Sized):
+            total = len(items)
+        if total == 0:
+            return
+        window = max(1, window or 2 * self.workers)
+
+        inflight: Set[Future] = set()
+        bar = self.progress_bar(
+            total=total,
+            desc=desc,
+            unit=unit,
+            disable=disable_bar,
+        )
+        try:
+            yield from self._resolve_completed(
+                self._complete_in_window(
+                    fn,
+                    iter(items),
+                    window,
+                    inflight,
+                    submit or self.executor.submit,
+                ),
+                bar=bar,
+                fail_fast=fail_fast,
+                signal=signal,
+            )
+        finally:
+            self.cancel_futures(list(inflight))
+            inflight.clear()
+            bar.close()
+
+    def _complete_in_window(
+        self,
+        fn: Callable[[Any], Any],
+        items: Iterator[Any],
+        window: int,
+        inflight: Set[Future],
+        submit: Callable[..., Future],
+    ) -> Generator[Future, None, None]:
+        exhausted = False
+        while True:
+            while not exhausted and len(inflight) < window:
+                try:
+                    item = next(items)
+                except StopIteration:
+                    exhausted = True
+                    break
+                inflight.add(submit(fn, item))
+            if not inflight:
+                return
+            done, _ = wait(inflight, return_when=FIRST_COMPLETED)
+            for future in done:
+                inflight.discard(future)
+                yield future
+
+    def _resolve_completed(
+        self,
+        completed: Iterable[Future],
+        bar: tqdm,
+        fail_fast: bool,
+        signal: Event,
+    ) -> Generator[Any, None, None]:
+        try:
+            for future in completed:
                 if signal.is_set():
                     return  # canceled
                 if fail_fast:
@@ -233,13 +375,6 @@ class TaskManager(ABC):
         except KeyboardInterrupt:
             signal.set()
             raise
-        finally:
-            Thread(
-                target=self.cancel_futures,
-                kwargs=dict(futures=futures),
-                # daemon=True,
-            ).start()
-            bar.close()
 
     def resolve_futures(
         self,
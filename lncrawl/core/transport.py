@@ -0,0 +1,244 @@
+import logging
+import ssl
+import time
+from datetime import timedelta
+from http.client import HTTPMessage
+from threading import Lock
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import httpx
+from requests import PreparedRequest, Response
+from requests import exceptions as rex
+from requests.adapters import BaseAdapter
+from requests.cookies import extract_cookies_to_jar
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers, select_proxy
+
+logger = logging.getLogger(__name__)
+
+# Response headers that no longer apply once httpx has decoded the body
+DECODED_HEADERS = ("Content-Encoding", "Content-Length", "Transfer-Encoding")
+
+# Request headers of HTTP/1.1 connections, which are not allowed in HTTP/2
+HOP_BY_HOP_HEADERS = ("connection", "keep-alive", "proxy-connection", "transfer-encoding", "upgrade")
+
+
+class _HeaderSource:
+    """What `requests` expects to find on a raw urllib3 response to read cookies"""
+
+    def __init__(self, headers: Iterable[Tuple[str, str]]) -> None:
+        self.msg = HTTPMessage()
+        for name, value in headers:
+            self.msg[name] = value
+
+
+class RawResponse:
+    """A file-like body for `requests.Response.raw`, backed by a stream of chunks.
+
+    Args:
+    - chunks (Iterator[bytes]): The decoded body.
+    - headers (Iterable[Tuple[str, str]]): All response headers, including repeated ones.
+    - close (Callable, optional): Called when the body is closed.
+    """
+
+    def __init__(self, chunks: Iterator[bytes], headers: Iterable[Tuple[str, str]], close=None) -> None:
+        self._chunks = chunks
+        self._buffer = b""
+        self._close = close
+        self._original_response = _HeaderSource(headers)
+        self.closed = False
+
+    def stream(self, amt: int = 65536, decode_content: bool = True):
+        while True:
+            data = self.read(amt)
+            if not data:
+                break
+            yield data
+
+    def read(self, amt: Optional[int] = None, decode_content: bool = True) -> bytes:
+        while not self.closed and (amt is None or len(self._buffer) < amt):
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self.close()
+                break
+            self._buffer += chunk
+        if amt is None:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:amt], self._buffer[amt:]
+        return data
+
+    def release_conn(self) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if not self.closed:
+            self.closed = True
+            if self._close:
+                self._close()
+
+
+def build_response(
+    request: PreparedRequest,
+    status_code: int,
+    headers: List[Tuple[str, str]],
+    body: Iterator[bytes],
+    reason: str = "",
+    elapsed: float = 0,
+    close=None,
+    connection: Optional[BaseAdapter] = None,
+) -> Response:
+    """Creates a `requests.Response` from a response of another HTTP client.
+
+    The body must already be decoded. Cookies are extracted just like the
+    requests' HTTPAdapter does, so sessions keep working as before.
+    """
+    response = Response()
+    response.status_code = status_code
+    response.reason = reason
+    response.headers = CaseInsensitiveDict()
+    for name, value in headers:
+        if name.title() in DECODED_HEADERS:
+            continue
+        if name in response.headers:
+            response.headers[name] += ", " + value
+        else:
+            response.headers[name] = value
+    response.encoding = get_encoding_from_headers(response.headers)
+    response.raw = RawResponse(body, headers, close)
+    response.url = request.url or ""
+    response.request = request
+    response.elapsed = timedelta(seconds=elapsed)
+    response.connection = connection
+    extract_cookies_to_jar(response.cookies, request, response.raw)
+    return response
+
+
+class Http2Adapter(BaseAdapter):
+    def __init__(
+        self,
+        max_connections: int = 10,
+        ciphers: Optional[str] = None,
+    ) -> None:
+        """A `requests` transport adapter that talks HTTP/2 through httpx.
+
+        All concurrent requests to a host are multiplexed over a few connections.
+        Hosts without HTTP/2 support are served over HTTP/1.1 as usual. Headers,
+        cookies and redirects are still handled by the requests session; each
+        proxy gets a client of its own.
+
+        Args:
+        - max_connections (int, optional): Maximum connections per client. Default: 10.
+        - ciphers (str, optional): OpenSSL cipher list for verified connections.
+        """
+        super().__init__()
+        self.max_connections = max_connections
+        self.ciphers = ciphers
+        self._lock = Lock()
+        self._clients: Dict[Tuple[Any, ...], httpx.Client] = {}
+
+    def _client(self, proxy: Optional[str], verify: Any, cert: Any) -> httpx.Client:
+        key = (proxy, verify if isinstance(verify, (bool, str)) else True, cert)
+        client = self._clients.get(key)
+        if client:
+            return client
+        with self._lock:
+            client = self._clients.get(key)
+            if client:
+                return client
+            if verify is True and self.ciphers:
+                verify = ssl.create_default_context()
+                try:
+                    verify.set_ciphers(self.ciphers)
+                except ssl.SSLError as e:
+                    logger.debug(f"Using default ciphers for HTTP/2: {e}")
+            client = httpx.Client(
+                http2=True,
+                proxy=proxy,
+                verify=verify,
+                cert=cert,
+                follow_redirects=False,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+            self._clients[key] = client
+        return client
+
+    def send(
+        self,
+        request: PreparedRequest,
+        stream: bool = False,
+        timeout: Any = None,
+        verify: Any = True,
+        cert: Any = None,
+        proxies: Optional[Dict[str, str]] = None,
+    ) -> Response:
+        proxy = select_proxy(request.url, proxies or {})
+        client = self._client(proxy, verify, cert)
+
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            timeout = httpx.Timeout(read, connect=connect)
+        else:
+            timeout = httpx.Timeout(timeout)
+
+        body = request.body
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+
+        # build the request directly, so the client adds no headers or cookies of its own
+        req = httpx.Request(
+            request.method or "GET",
+            request.url or "",
+            headers=[
+                (str(k), str(v))
+                for k, v in request.headers.items()
+                if str(k).lower() not in HOP_BY_HOP_HEADERS
+            ],
+            content=body,
+            extensions={"timeout": timeout.as_dict()},
+        )
+        start = time.monotonic()
+        try:
+            res = client.send(req, stream=True)
+        except httpx.ProxyError as e:
+            raise rex.ProxyError(e, request=request)
+        except httpx.ConnectTimeout as e:
+            raise rex.ConnectTimeout(e, request=request)
+        except httpx.TimeoutException as e:
+            raise rex.ReadTimeout(e, request=request)
+        except httpx.TransportError as e:
+            raise rex.ConnectionError(e, request=request)
+
+        response = build_response(
+            request,
+            status_code=res.status_code,
+            headers=res.headers.multi_items(),
+            body=self._iter_body(res, request),
+            reason=res.reason_phrase,
+            elapsed=time.monotonic() - start,
+            close=res.close,
+            connection=self,
+        )
+        if not stream:
+            response.content
+        return response
+
+    def _iter_body(self, res: httpx.Response, request: PreparedRequest) -> Iterator[bytes]:
+        try:
+            yield from res.iter_bytes()
+        except httpx.TimeoutException as e:
+            raise rex.ReadTimeout(e, request=request)
+        except httpx.TransportError as e:
+            raise rex.ChunkedEncodingError(e, request=request)
+        finally:
+            res.close()
+
+    def close(self) -> None:
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            client.close()
@@ -1,11 +1,8 @@
 import logging
 from abc import abstractmethod
-from io import BytesIO
 from threading import Event
 from typing import Generator, List, Optional
 
-from PIL import Image
-
 from ...core.browser import Browser, By
 from ...core.crawler import Crawler
 from ...core.exeptions import FallbackToBrowser, ScraperErrorGroup
@@ -113,7 +110,8 @@ class BasicBrowserTemplate(Crawler):
             def _downloader(chapter: Chapter):
                 chapter.body = ""
                 chapter.images = {}
-                chapter.body = self.download_chapter_body_in_soup(chapter)
+                with self.collect_images(chapter):
+                    chapter.body = self.download_chapter_body_in_soup(chapter)
                 self.extract_chapter_images(chapter)
                 chapter.success = bool(chapter.body)
                 return chapter
@@ -144,7 +142,8 @@ class BasicBrowserTemplate(Crawler):
             chapter.images = {}
             try:
                 print(chapter.id, chapter.body[:50])
-                chapter.body = self.download_chapter_body(chapter)
+                with self.collect_images(chapter):
+                    chapter.body = self.download_chapter_body(chapter)
                 self.extract_chapter_images(chapter)
                 chapter.success = True
             except Exception as e:
@@ -166,9 +165,9 @@ class BasicBrowserTemplate(Crawler):
             self.init_browser()
             return self.download_chapter_body_in_browser(chapter)
 
-    def download_image(self, url: str, headers={}, **kwargs):
+    def fetch_image(self, url: str, output_file: str, headers={}, **kwargs):
         try:
-            return super().download_image(url, headers, **kwargs)
+            return super().fetch_image(url, output_file, headers, **kwargs)
         except ScraperErrorGroup as e:
             if logger.isEnabledFor(logging.DEBUG):
                 logger.exception("Failed in download image: %s", e)
@@ -176,7 +175,9 @@ class BasicBrowserTemplate(Crawler):
             self._browser.visit(url)
             self.browser.wait("img", By.TAG_NAME)
             png = self.browser.find("img", By.TAG_NAME).screenshot_as_png
-            return Image.open(BytesIO(png))
+            with open(output_file, "wb") as f:
+                f.write(png)
+            return "PNG"
 
     def search_novel_in_soup(self, query: str) -> Generator[SearchResult, None, None]:
         """Search for novels with `self.scraper` requests"""
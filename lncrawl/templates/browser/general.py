@@ -112,8 +112,7 @@ class GeneralBrowserTemplate(BasicBrowserTemplate, GeneralSoupTemplate):
         return self.parse_chapter_list(self.browser.soup)
 
     def download_chapter_body_in_soup(self, chapter: Chapter) -> str:
-        soup = self.get_soup(chapter.url)
-        body = self.select_chapter_body(soup)
+        body = self.get_chapter_body(chapter)
         return self.parse_chapter_body(body)
 
     def download_chapter_body_in_browser(self, chapter: Chapter) -> str:
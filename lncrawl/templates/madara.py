@@ -11,6 +11,8 @@ logger = logging.getLogger(__name__)
 
 
 class MadaraTemplate(SearchableSoupTemplate, ChapterOnlyBrowserTemplate):
+    chapter_body_selector = "div.reading-content"
+
     is_template = True
 
     def initialize(self) -> None:
@@ -106,8 +108,3 @@ class MadaraTemplate(SearchableSoupTemplate, ChapterOnlyBrowserTemplate):
             title=tag.text.strip(),
             url=self.absolute_url(tag["href"]),
         )
-
-    def select_chapter_body(self, soup: BeautifulSoup) -> Tag:
-        body = soup.select_one("div.reading-content")
-        assert body
-        return body
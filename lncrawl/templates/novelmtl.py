@@ -12,6 +12,8 @@ from lncrawl.templates.browser.chapter_only import ChapterOnlyBrowserTemplate
 
 
 class NovelMTLTemplate(SearchableBrowserTemplate, ChapterOnlyBrowserTemplate):
+    chapter_body_selector = ".chapter-content"
+
     is_template = True
 
     def initialize(self) -> None:
@@ -103,8 +105,3 @@ class NovelMTLTemplate(SearchableBrowserTemplate, ChapterOnlyBrowserTemplate):
             url=self.absolute_url(tag["href"]),
             title=title.get_text(strip=True),
         )
-
-    def select_chapter_body(self, soup: BeautifulSoup) -> Tag:
-        body = soup.select_one(".chapter-content")
-        assert body
-        return body
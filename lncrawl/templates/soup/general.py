@@ -12,6 +12,11 @@ logger = logging.getLogger(__name__)
 
 
 class GeneralSoupTemplate(Crawler):
+    # The css selector of the tag containing the chapter text. When it is set
+    # instead of overriding `select_chapter_body`, only that region of the
+    # chapter pages is parsed.
+    chapter_body_selector: Optional[str] = None
+
     def read_novel_info(self) -> None:
         soup = self.get_novel_soup()
 
@@ -80,14 +85,29 @@ class GeneralSoupTemplate(Crawler):
         raise NotImplementedError()
 
     def download_chapter_body(self, chapter: Chapter) -> str:
-        soup = self.get_soup(chapter.url)
-        body = self.select_chapter_body(soup)
+        body = self.get_chapter_body(chapter)
         return self.parse_chapter_body(body)
 
-    @abstractmethod
+    def get_chapter_body(self, chapter: Chapter) -> Tag:
+        """Download the chapter page and select the tag containing the chapter text"""
+        if (
+            self.chapter_body_selector
+            and type(self).select_chapter_body is GeneralSoupTemplate.select_chapter_body
+        ):
+            body = self.get_region(chapter.url, self.chapter_body_selector)
+            if not body:
+                raise LNException(f"Chapter body not found: {chapter.url}")
+            return body
+        soup = self.get_soup(chapter.url)
+        return self.select_chapter_body(soup)
+
     def select_chapter_body(self, soup: BeautifulSoup) -> Tag:
         """Select the tag containing the chapter text"""
-        raise NotImplementedError()
+        if not self.chapter_body_selector:
+            raise NotImplementedError()
+        body = soup.select_one(self.chapter_body_selector)
+        assert body
+        return body
 
     def parse_chapter_body(self, tag: Tag) -> str:
         """Extract the clean HTML content from the tag containing the chapter text"""
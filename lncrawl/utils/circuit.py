@@ -0,0 +1,187 @@
+import logging
+import time
+from collections import deque
+from threading import Lock
+from typing import Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitBreaker(object):
+    """A closed/open/half-open circuit breaker for a single host.
+
+    While closed, every request is allowed and its outcome is recorded. The
+    circuit opens after `max_consecutive` failures in a row, or when at least
+    half of the last `window` outcomes are failures. While open, requests are
+    refused until `open_seconds` have passed; then a single probe is let
+    through. A successful probe closes the circuit, a failed one opens it
+    again for twice as long, up to `max_open_seconds`. Client errors, like a
+    404, are neither successes nor failures.
+
+    Args:
+    - name (str): Name of the host, for logging.
+    - max_consecutive (int, optional): Consecutive failures to open. Default: 10.
+    - window (int, optional): Number of recent outcomes to consider. Default: 40.
+    - open_seconds (float, optional): Initial time to stay open. Default: 30.
+    - max_open_seconds (float, optional): Longest time to stay open. Default: 300.
+    """
+
+    def __init__(
+        self,
+        name: str = "",
+        max_consecutive: int = 10,
+        window: int = 40,
+        open_seconds: float = 30,
+        max_open_seconds: float = 300,
+    ):
+        self.name = name
+        self.max_consecutive = max_consecutive
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self._lock = Lock()
+        self._state = CLOSED
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._consecutive = 0
+        self._opened_at = 0.0
+        self._cooldown = open_seconds
+        self._probing = False
+        self._probe_at = 0.0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self._cooldown_over():
+                return HALF_OPEN
+            return self._state
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == OPEN
+
+    def allow(self) -> bool:
+        """Returns True if a request may be sent now"""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN:
+                if not self._cooldown_over():
+                    return False
+                self._state = HALF_OPEN
+                self._probing = False
+            now = time.monotonic()
+            # allow another probe if the last one never reported back
+            if self._probing and now - self._probe_at < self._cooldown:
+                return False
+            self._probing = True
+            self._probe_at = now
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._outcomes.append(True)
+            self._consecutive = 0
+            if self._state != CLOSED:
+                logger.info("Circuit closed for %s", self.name)
+                self._state = CLOSED
+                self._probing = False
+                self._cooldown = self.open_seconds
+                self._outcomes.clear()
+
+    def record_neutral(self) -> None:
+        """Records an outcome that says nothing about the health of the host,
+        like a 404. A half-open circuit lets the next probe through."""
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._outcomes.append(False)
+            self._consecutive += 1
+            if self._state == HALF_OPEN:
+                self._cooldown = min(self.max_open_seconds, self._cooldown * 2)
+                self._open()
+            elif self._state == CLOSED and self._should_open():
+                self._open()
+
+    def _should_open(self) -> bool:
+        if self._consecutive >= self.max_consecutive:
+            return True
+        if len(self._outcomes) < self._outcomes.maxlen:  # type:ignore
+            return False
+        return self._outcomes.count(False) * 2 >= len(self._outcomes)
+
+    def _open(self) -> None:
+        self._state = OPEN
+        self._probing = False
+        self._opened_at = time.monotonic()
+        logger.warning("Circuit opened for %s for %ds", self.name, self._cooldown)
+
+    def _cooldown_over(self) -> bool:
+        return time.monotonic() - self._opened_at >= self._cooldown
+
+
+class RetryBudget(object):
+    """Caps retries to a fraction of the requests made in a recent period.
+
+    When a host goes down, every request fails and wants to retry. With a
+    budget the number of retries stays proportional to the normal traffic,
+    instead of multiplying it.
+
+    Args:
+    - ratio (float, optional): Allowed retries per request. Default: 0.2.
+    - period (float, optional): Seconds of history to consider. Default: 10.
+    - min_retries (int, optional): Retries always allowed per period. Default: 10.
+    """
+
+    def __init__(self, ratio: float = 0.2, period: float = 10, min_retries: int = 10):
+        self.ratio = ratio
+        self.period = period
+        self.min_retries = min_retries
+        self._lock = Lock()
+        self._requests: Deque[float] = deque()
+        self._retries: Deque[float] = deque()
+
+    def record_request(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._requests.append(now)
+            self._prune(now)
+
+    def try_retry(self) -> bool:
+        """Takes a retry from the budget; returns False if none is left"""
+        with self._lock:
+            now = time.monotonic()
+            self._prune(now)
+            allowed = max(self.min_retries, self.ratio * len(self._requests))
+            if len(self._retries) >= allowed:
+                return False
+            self._retries.append(now)
+            return True
+
+    def _prune(self, now: float) -> None:
+        expiry = now - self.period
+        while self._requests and self._requests[0] < expiry:
+            self._requests.popleft()
+        while self._retries and self._retries[0] < expiry:
+            self._retries.popleft()
+
+
+_circuits_lock = Lock()
+_circuits: Dict[str, CircuitBreaker] = {}
+
+retry_budget = RetryBudget()
+
+
+def get_circuit(hostname: Optional[str]) -> CircuitBreaker:
+    """Returns the process-wide circuit breaker of the host"""
+    hostname = hostname or ""
+    circuit = _circuits.get(hostname)
+    if circuit is None:
+        with _circuits_lock:
+            circuit = _circuits.setdefault(hostname, CircuitBreaker(hostname))
+    return circuit
@@ -0,0 +1,183 @@
+import ipaddress
+import logging
+import os
+import socket
+import time
+from threading import Lock, local
+from typing import Any, Dict, List, Optional, Tuple
+
+from urllib3.util import connection
+
+from .singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+AddrInfo = Tuple[Any, Any, int, str, Any]
+
+
+class DnsCache(object):
+    """An in-process cache of getaddrinfo results.
+
+    The system resolver does not tell the record TTL, so every answer is kept
+    for a fixed `ttl`, and a failed lookup for `negative_ttl`. Concurrent
+    lookups of the same host wait for a single resolver call.
+
+    Args:
+    - ttl (float, optional): Seconds to keep a resolved address. Default: 300.
+    - negative_ttl (float, optional): Seconds to keep a failed lookup. Default: 30.
+    - max_entries (int, optional): Maximum number of cached lookups. Default: 1024.
+    """
+
+    def __init__(self, ttl: float = 300, negative_ttl: float = 30, max_entries: int = 1024):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._lock = Lock()
+        self._flight = SingleFlight()
+        self._entries: Dict[tuple, Tuple[float, Any]] = {}
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "negative_hits": 0,
+            "failures": 0,
+            "resolve_seconds": 0.0,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries))
+
+    def _count(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._stats[name] += value
+
+    def resolve(self, host: str, port: int, family: int = 0) -> List[AddrInfo]:
+        key = (host, port, family)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            if isinstance(entry[1], socket.gaierror):
+                self._count("negative_hits")
+                raise entry[1]
+            self._count("hits")
+            return entry[1]
+
+        result, _ = self._flight.do(key, lambda: self._lookup(key))
+        if isinstance(result, socket.gaierror):
+            raise result
+        return result
+
+    def _lookup(self, key: tuple) -> Any:
+        host, port, family = key
+        self._count("misses")
+        start = time.monotonic()
+        try:
+            result: Any = socket.getaddrinfo(host, port, family, socket.SOCK_STREAM)
+            expires = time.monotonic() + self.ttl
+        except socket.gaierror as e:
+            self._count("failures")
+            result = e
+            expires = time.monotonic() + self.negative_ttl
+        self._count("resolve_seconds", time.monotonic() - start)
+
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._evict()
+            self._entries[key] = (expires, result)
+        return result
+
+    def invalidate(self, host: str) -> None:
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == host]:
+                self._entries.pop(key, None)
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        for key in [k for k, v in self._entries.items() if v[0] <= now]:
+            del self._entries[key]
+        while len(self._entries) >= self.max_entries:
+            del self._entries[next(iter(self._entries))]
+
+
+_original_create_connection = connection.create_connection
+_dns_cache: Optional[DnsCache] = None
+_timings = local()
+
+
+def _is_ip_address(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host.strip("[]"))
+        return True
+    except ValueError:
+        return False
+
+
+def _add_timing(name: str, value: float) -> None:
+    timings = _timings.__dict__.setdefault("values", {})
+    timings[name] = timings.get(name, 0.0) + value
+
+
+def pop_connection_timings() -> Dict[str, float]:
+    """Returns the seconds spent on DNS lookups and TCP connects by the
+    current thread since the last call. It is empty if no connection was made.
+    """
+    return _timings.__dict__.pop("values", None) or {}
+
+
+def _create_connection(address, *args, **kwargs):
+    host, port = address
+    cache = _dns_cache
+    if cache is None or not host or _is_ip_address(host) or host == "localhost":
+        start = time.monotonic()
+        try:
+            return _original_create_connection(address, *args, **kwargs)
+        finally:
+            _add_timing("connect", time.monotonic() - start)
+
+    family = connection.allowed_gai_family()
+    error: Optional[Exception] = None
+    start = time.monotonic()
+    addresses = cache.resolve(host, port, family)
+    _add_timing("dns", time.monotonic() - start)
+    for _, _, _, _, sockaddr in addresses:
+        start = time.monotonic()
+        try:
+            return _original_create_connection((sockaddr[0], port), *args, **kwargs)
+        except OSError as e:
+            error = e
+        finally:
+            _add_timing("connect", time.monotonic() - start)
+
+    # the host may have moved; look it up again next time
+    cache.invalidate(host)
+    if error is not None:
+        raise error
+    raise OSError("getaddrinfo returns an empty list")
+
+
+def install_dns_cache(ttl: Optional[float] = None) -> Optional[DnsCache]:
+    """Route new urllib3 connections through a process-wide DNS cache.
+
+    The TTL is taken from the DNS_CACHE_TTL environment variable if not given.
+    Default is 300 seconds; 0 disables the cache.
+
+    Returns:
+        The installed cache, or None if it is disabled.
+    """
+    global _dns_cache
+    if ttl is None:
+        ttl = float(os.getenv("DNS_CACHE_TTL", "300"))
+    if ttl <= 0:
+        connection.create_connection = _original_create_connection
+        _dns_cache = None
+        return None
+    if _dns_cache is None:
+        _dns_cache = DnsCache(ttl=ttl)
+    else:
+        _dns_cache.ttl = ttl
+    connection.create_connection = _create_connection
+    return _dns_cache
+
+
+def get_dns_cache() -> Optional[DnsCache]:
+    return _dns_cache
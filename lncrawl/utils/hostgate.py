@@ -0,0 +1,204 @@
+import logging
+import time
+from collections import deque
+from threading import Condition, local
+from typing import Any, Deque, Dict, Optional
+
+from .hostlimit import get_shared_limiter
+
+logger = logging.getLogger(__name__)
+
+# Status codes which mean the host is asking us to slow down
+THROTTLE_STATUS_CODES = {403, 429, 503}
+
+# Number of recent responses to consider for latency and success rate
+SAMPLE_WINDOW = 64
+MIN_SAMPLES = 16
+
+# Cut the window when p95 latency is this many times above the baseline
+LATENCY_TOLERANCE = 2.0
+
+# Multiplicative decrease factors
+THROTTLE_BACKOFF = 0.5
+LATENCY_BACKOFF = 0.75
+
+# Minimum fraction of healthy responses required to widen the window
+HEALTHY_RATIO = 0.95
+
+
+class AdaptiveGate(object):
+    """An AIMD (additive-increase, multiplicative-decrease) concurrency gate.
+
+    The gate behaves like a semaphore whose size adapts to the host. It widens
+    by about one slot per window of healthy responses, and is cut down sharply
+    when the host responds with 403/429/503 or when the p95 latency rises well
+    above the observed baseline. It is being used by the TaskManager.domain_gate.
+
+    When a shared limiter is installed, entering the gate also takes a slot
+    for the hostname from it, so that the limit holds across processes.
+
+    Args:
+    - initial (int): Initial number of concurrent entries.
+    - minimum (int): Lower bound of concurrent entries. Default: 1.
+    - maximum (int): Upper bound of concurrent entries.
+    - hostname (str, optional): The host this gate belongs to.
+
+    Example:
+        with gate:
+            response = session.get(url)
+            response.raise_for_status()
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        minimum: int = 1,
+        maximum: Optional[int] = None,
+        hostname: Optional[str] = None,
+    ):
+        if minimum < 1:
+            raise ValueError("minimum should be a positive number")
+        self.hostname = hostname
+        self.minimum = minimum
+        self.maximum = max(maximum or initial, initial, minimum)
+        self._limit = float(max(initial, minimum))
+        self._active = 0
+        self._waiting = 0
+        self._cond = Condition()
+        self._local = local()
+        self._latencies: Deque[float] = deque(maxlen=SAMPLE_WINDOW)
+        self._outcomes: Deque[bool] = deque(maxlen=SAMPLE_WINDOW)
+        self._baseline: Optional[float] = None
+        self._last_decrease = 0.0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def waiting(self) -> int:
+        return self._waiting
+
+    def acquire(self, blocking: bool = True, timeout: Optional[float] = None) -> bool:
+        with self._cond:
+            if self._active >= self.limit:
+                if not blocking:
+                    return False
+                self._waiting += 1
+                try:
+                    ok = self._cond.wait_for(lambda: self._active < self.limit, timeout)
+                finally:
+                    self._waiting -= 1
+                if not ok:
+                    return False
+            self._active += 1
+            return True
+
+    def release(self) -> None:
+        with self._cond:
+            if self._active > 0:
+                self._active -= 1
+            self._cond.notify()
+
+    @property
+    def last_wait(self) -> float:
+        """Seconds the current thread last waited to enter the gate"""
+        return getattr(self._local, "wait", 0.0)
+
+    def __enter__(self):
+        waited_from = time.monotonic()
+        self.acquire()
+        shared = get_shared_limiter()
+        if shared and self.hostname:
+            try:
+                shared.acquire(self.hostname)
+            except BaseException:
+                self.release()
+                raise
+        started = time.monotonic()
+        self._local.wait = started - waited_from
+        starts = self._local.__dict__.setdefault("starts", [])
+        starts.append((started, shared))
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        started, shared = self._local.starts.pop()
+        if shared and self.hostname:
+            shared.release(self.hostname)
+        self.release()
+        self.feedback(_status_of(exc), time.monotonic() - started)
+
+    def feedback(self, status: Optional[int], latency: float) -> None:
+        """Adjust the window from the outcome of a single request.
+
+        Args:
+            status: The HTTP status code, or None if there was no response.
+            latency: Seconds taken by the request.
+        """
+        with self._cond:
+            if status in THROTTLE_STATUS_CODES:
+                self._decrease(THROTTLE_BACKOFF, f"status {status}")
+                return
+
+            if status is None or status >= 500:
+                self._outcomes.append(False)
+                return
+            if status >= 400:
+                return  # not a signal of host health
+
+            self._outcomes.append(True)
+            self._latencies.append(latency)
+            if len(self._latencies) < MIN_SAMPLES:
+                return
+
+            p95 = self._p95()
+            if self._baseline is None or p95 < self._baseline:
+                self._baseline = p95
+            else:
+                # let the baseline follow slow and steady drifts
+                self._baseline += (p95 - self._baseline) * 0.01
+
+            if p95 > self._baseline * LATENCY_TOLERANCE:
+                self._decrease(LATENCY_BACKOFF, f"p95 latency {p95:.2f}s")
+            elif sum(self._outcomes) >= HEALTHY_RATIO * len(self._outcomes):
+                self._increase()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "limit": self.limit,
+                "active": self._active,
+                "waiting": self._waiting,
+                "p95": round(self._p95(), 3) if self._latencies else None,
+            }
+
+    def _p95(self) -> float:
+        values = sorted(self._latencies)
+        return values[int(0.95 * (len(values) - 1))]
+
+    def _increase(self) -> None:
+        if self._limit >= self.maximum:
+            return
+        self._limit = min(self.maximum, self._limit + 1 / self._limit)
+        self._cond.notify()
+
+    def _decrease(self, factor: float, reason: str) -> None:
+        now = time.monotonic()
+        # a burst of concurrent failures should only cut the window once
+        if now - self._last_decrease < max(1.0, self._baseline or 0):
+            return
+        self._last_decrease = now
+        self._limit = max(self.minimum, self._limit * factor)
+        self._latencies.clear()
+        logger.debug("Gate window reduced to %d | %s", self.limit, reason)
+
+
+def _status_of(exc: Optional[BaseException]) -> Optional[int]:
+    if exc is None:
+        return 200
+    response = getattr(exc, "response", None)
+    return getattr(response, "status_code", None)
@@ -0,0 +1,181 @@
+import logging
+import multiprocessing
+import os
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Maximum bytes of a hostname kept in the shared table
+HOST_NAME_SIZE = 64
+
+# Number of distinct hosts the shared table can hold
+HOST_TABLE_SIZE = 256
+
+# Seconds between checks for slots held by dead processes, while waiting
+REAP_INTERVAL = 1.0
+
+
+class SharedHostLimiter(object):
+    """A per-host concurrency limit shared by multiple processes.
+
+    The slots live in shared memory and are guarded by a single
+    multiprocessing condition, so every worker of a process pool sees the
+    same number of requests in flight for a host. Hostnames are kept in an
+    open-addressed table of fixed size; a host keeps its slot once assigned.
+
+    Each slot records the pid of the process holding it. When all slots of a
+    host are taken, the ones held by processes that have died (killed, or out
+    of memory) are reclaimed, so they can not block the host forever.
+
+    The limiter must be created in the parent process and handed to the
+    children on creation, e.g. with the `initargs` of a ProcessPoolExecutor,
+    then installed with `set_shared_limiter` in each child.
+
+    Args:
+    - limit (int): Maximum number of requests in flight per host across all processes.
+    - size (int, optional): Number of hosts the table can hold. Default: 256.
+    """
+
+    def __init__(self, limit: int, size: int = HOST_TABLE_SIZE):
+        if limit < 1:
+            raise ValueError("limit should be a positive number")
+        self.limit = limit
+        self.size = size
+        self._cond = multiprocessing.Condition(multiprocessing.Lock())
+        self._names = multiprocessing.RawArray("c", size * HOST_NAME_SIZE)
+        self._owners = multiprocessing.RawArray("i", size * limit)
+
+    def acquire(self, hostname: str, timeout: Optional[float] = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            index = self._index(hostname)
+            if index < 0:
+                return True  # unknown host or full table; do not block
+            while True:
+                cell = self._free_cell(index)
+                if cell >= 0:
+                    self._owners[cell] = os.getpid()
+                    return True
+                wait = REAP_INTERVAL
+                if deadline is not None:
+                    wait = min(wait, deadline - time.monotonic())
+                    if wait <= 0:
+                        return False
+                # a dead owner never notifies; wake up to look for one
+                self._cond.wait(wait)
+
+    def release(self, hostname: str) -> None:
+        with self._cond:
+            index = self._index(hostname)
+            if index < 0:
+                return
+            pid = os.getpid()
+            start = index * self.limit
+            for cell in range(start, start + self.limit):
+                if self._owners[cell] == pid:
+                    self._owners[cell] = 0
+                    # waiters of different hosts share the condition
+                    self._cond.notify_all()
+                    return
+
+    @contextmanager
+    def slot(self, hostname: str):
+        self.acquire(hostname)
+        try:
+            yield
+        finally:
+            self.release(hostname)
+
+    def usage(self) -> Dict[str, int]:
+        """Returns number of slots in use for each known host"""
+        with self._cond:
+            result = {}
+            for index in range(self.size):
+                name = self._name_at(index)
+                if name:
+                    start = index * self.limit
+                    owners = self._owners[start:start + self.limit]
+                    result[name] = sum(1 for pid in owners if pid)
+            return result
+
+    def _free_cell(self, index: int) -> int:
+        start = index * self.limit
+        cells = range(start, start + self.limit)
+        for cell in cells:
+            if not self._owners[cell]:
+                return cell
+        for cell in cells:
+            pid = self._owners[cell]
+            if not _is_alive(pid):
+                name = self._name_at(index)
+                logger.warning("Reclaimed a slot of %s held by dead process %d", name, pid)
+                self._owners[cell] = 0
+                return cell
+        return -1
+
+    def _name_at(self, index: int) -> str:
+        start = index * HOST_NAME_SIZE
+        raw = self._names[start:start + HOST_NAME_SIZE]
+        return raw.rstrip(b"\0").decode("utf-8", "ignore")
+
+    def _index(self, hostname: str) -> int:
+        key = (hostname or "").encode("utf-8")[:HOST_NAME_SIZE]
+        if not key:
+            return -1
+        # the builtin hash() is salted per process, crc32 is not
+        start = zlib.crc32(key) % self.size
+        for probe in range(self.size):
+            index = (start + probe) % self.size
+            offset = index * HOST_NAME_SIZE
+            name = self._names[offset:offset + HOST_NAME_SIZE].rstrip(b"\0")
+            if name == key:
+                return index
+            if not name:
+                self._names[offset:offset + len(key)] = key
+                return index
+        logger.warning("Shared host table is full. Not limiting %s", hostname)
+        return -1
+
+
+def _is_alive(pid: int) -> bool:
+    if os.name == "nt":
+        return True  # signal 0 would terminate the process on windows
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass  # exists, but owned by another user
+    return True
+
+
+_shared_limiter: Optional[SharedHostLimiter] = None
+
+
+def set_shared_limiter(limiter: Optional[SharedHostLimiter]) -> None:
+    """Install the limiter to be consulted by every request of this process"""
+    global _shared_limiter
+    _shared_limiter = limiter
+
+
+def get_shared_limiter() -> Optional[SharedHostLimiter]:
+    return _shared_limiter
+
+
+@contextmanager
+def host_slot(hostname: Optional[str]):
+    """Hold a slot of the shared limiter for the hostname, if one is installed.
+
+    Example:
+        with host_slot(urlparse(url).hostname):
+            session.get(url)
+    """
+    limiter = _shared_limiter
+    if limiter is None:
+        yield
+        return
+    with limiter.slot(hostname or ""):
+        yield
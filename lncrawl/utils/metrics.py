@@ -0,0 +1,168 @@
+import math
+from collections import Counter
+from threading import Lock
+from typing import Any, Dict, Iterable, Optional
+
+# Timings are kept in log2 buckets of this many seconds, from 1ms up
+TIME_SCALE = 0.001
+
+# Sizes are kept in log2 buckets of this many bytes, from 1KB up
+SIZE_SCALE = 1024
+
+# Names of the timing histograms, in the order a request goes through them.
+# `ttfb` includes the TLS handshake of a new connection, and `download` is
+# everything after the response headers, including reading the body.
+TIMINGS = ("gate_wait", "throttle_wait", "dns", "connect", "ttfb", "download", "total")
+
+# Names of the size histograms
+SIZES = ("bytes_in", "bytes_out")
+
+
+class Histogram(object):
+    """A histogram with log2 buckets, which is cheap to update and merge.
+
+    A value falls in the bucket `ceil(log2(value / scale))`, so percentiles
+    are estimated within a factor of two, which is enough to tell a 50ms
+    response from a 5s one.
+
+    Args:
+    - scale (float, optional): Upper bound of the first bucket. Default: 1.
+    """
+
+    def __init__(self, scale: float = 1) -> None:
+        self.scale = scale
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value: float) -> None:
+        index = 0
+        if value > self.scale:
+            index = math.ceil(math.log2(value / self.scale))
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th percentile, capped at the max"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(self.max, self.scale * (2 ** index))
+        return self.max
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": round(self.total, 6),
+            "mean": round(self.total / self.count, 6) if self.count else 0,
+            "p50": round(self.percentile(0.5), 6),
+            "p95": round(self.percentile(0.95), 6),
+            "p99": round(self.percentile(0.99), 6),
+            "max": round(self.max, 6),
+        }
+
+
+class HostMetrics(object):
+    def __init__(self) -> None:
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.statuses: Counter = Counter()
+        self.histograms: Dict[str, Histogram] = {
+            **{name: Histogram(TIME_SCALE) for name in TIMINGS},
+            **{name: Histogram(SIZE_SCALE) for name in SIZES},
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "statuses": {str(k): v for k, v in sorted(self.statuses.items(), key=str)},
+            **{
+                name: histogram.summary()
+                for name, histogram in self.histograms.items()
+                if histogram.count
+            },
+        }
+
+
+class RequestMetrics(object):
+    """Per host timings, sizes and outcomes of HTTP requests.
+
+    Every observation is also passed on to the parent, so a crawler can keep
+    the metrics of its own job while the process keeps the totals.
+
+    Args:
+    - parent (RequestMetrics, optional): Collector to pass observations on to.
+    """
+
+    def __init__(self, parent: Optional["RequestMetrics"] = None) -> None:
+        self.parent = parent
+        self._lock = Lock()
+        self._hosts: Dict[str, HostMetrics] = {}
+
+    def _host(self, hostname: Optional[str]) -> HostMetrics:
+        hostname = hostname or ""
+        host = self._hosts.get(hostname)
+        if host is None:
+            host = self._hosts.setdefault(hostname, HostMetrics())
+        return host
+
+    def record(
+        self,
+        hostname: Optional[str],
+        status: Optional[int] = None,
+        error: Optional[BaseException] = None,
+        **values: Optional[float],
+    ) -> None:
+        """Records a single request.
+
+        Args:
+        - hostname (str): The host of the request.
+        - status (int, optional): The response status code.
+        - error (Exception, optional): The error, if there was no response.
+        - values: Timings in seconds and sizes in bytes by the names of TIMINGS and SIZES.
+        """
+        with self._lock:
+            host = self._host(hostname)
+            host.requests += 1
+            if error is not None and status is None:
+                host.errors += 1
+                host.statuses[type(error).__name__] += 1
+            elif status is not None:
+                host.statuses[status] += 1
+            for name, value in values.items():
+                if value is not None:
+                    host.histograms[name].add(value)
+        if self.parent:
+            self.parent.record(hostname, status, error, **values)
+
+    def record_retry(self, hostname: Optional[str]) -> None:
+        with self._lock:
+            self._host(hostname).retries += 1
+        if self.parent:
+            self.parent.record_retry(hostname)
+
+    def hosts(self) -> Iterable[str]:
+        return list(self._hosts.keys())
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Returns the metrics of every host, keyed by hostname"""
+        with self._lock:
+            return {name: host.summary() for name, host in self._hosts.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._hosts.clear()
+
+
+# Totals of all requests in this process
+request_metrics = RequestMetrics()
@@ -1,42 +1,113 @@
 import logging
 import time
+from threading import Event, Lock
+from typing import Dict, Optional
 
 logger = logging.getLogger(__name__)
 
 
+class TokenBucket(object):
+    """A thread-safe token bucket.
+
+    Tokens are refilled at `rate` per second up to `capacity`. Each call to
+    `reserve` takes one token immediately and returns the number of seconds
+    the caller has to wait before the token is valid. Reservations are handed
+    out in order, so many threads can draw from the same bucket without
+    exceeding the average rate.
+
+    Args:
+    - rate (float): Number of tokens per second.
+    - capacity (float, optional): Maximum burst size. Default: 1.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1):
+        if rate <= 0:
+            raise ValueError("rate should be a non-zero positive number")
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = Lock()
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._updated
+            self._updated = now
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0
+            return -self._tokens / self.rate
+
+    def restrict(self, rate: float, capacity: float = 1) -> None:
+        """Lowers the rate and capacity of the bucket if the given ones are stricter"""
+        with self._lock:
+            self.rate = min(self.rate, rate)
+            self.capacity = min(self.capacity, max(1.0, capacity))
+            self._tokens = min(self._tokens, self.capacity)
+
+
+_buckets_lock = Lock()
+_buckets: Dict[str, TokenBucket] = {}
+
+
+def get_bucket(key: str, rate: float, capacity: float = 1) -> TokenBucket:
+    """Returns the process-wide token bucket for the given key.
+
+    All callers with the same key share one bucket, and the strictest rate and
+    capacity any of them asked for is applied to it. An empty key returns a
+    new bucket that is not shared.
+    """
+    if not key:
+        return TokenBucket(rate, capacity)
+    with _buckets_lock:
+        bucket = _buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(rate, capacity)
+            _buckets[key] = bucket
+        else:
+            bucket.restrict(rate, capacity)
+        return bucket
+
+
 class RateLimiter(object):
     """A helper class for a controlling number of requests per seconds.
     It is being used along with the TaskManager class.
 
+    Every call waits for a token from a bucket shared by all limiters with
+    the same key, so multiple workers can run at the same time while the
+    average number of calls per second is still honoured.
+
     Args:
     - ratelimit (float, optional): Number of requests per seconds.
+    - key (str, optional): The bucket key, e.g. a hostname.
+    - burst (float, optional): Number of calls allowed at once. Default: 1.
     """
 
-    def __init__(self, ratelimit: float):
+    def __init__(self, ratelimit: float, key: Optional[str] = None, burst: float = 1):
         if ratelimit <= 0:
             raise ValueError("ratelimit should be a non-zero positive number")
         self.period = 1 / ratelimit
-        self._closed = False
-
-    def _now(self):
-        if hasattr(time, "monotonic"):
-            return time.monotonic()
-        return time.time()
+        self._bucket = get_bucket(key or "", ratelimit, burst)
+        self._closed = Event()
 
     def __enter__(self):
-        self._time = self._now()
+        self.wait()
         return self
 
     def __exit__(self, type, value, traceback):
-        if self._closed:
+        pass
+
+    def wait(self):
+        if self._closed.is_set():
             return
-        d = (self._time + self.period) - self._now()
-        self._time = self._now()
-        if d > 0:
-            time.sleep(d)
+        delay = self._bucket.reserve()
+        if delay > 0:
+            self._closed.wait(delay)
 
     def shutdown(self):
-        self._closed = True
+        self._closed.set()
 
     def wrap(self, fn):
         def inner(*args, **kwargs):
@@ -0,0 +1,68 @@
+import logging
+from threading import Event, Lock
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _Call(object):
+    def __init__(self) -> None:
+        self.done = Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+
+
+class SingleFlight(object):
+    """Coalesce concurrent calls with the same key into one.
+
+    The first caller of a key runs the function. Callers arriving with the same
+    key before it finishes wait for it and receive the same result, or the same
+    exception. Once the call finishes the key is forgotten, so later callers
+    start a new call; this is not a cache.
+
+    Example:
+        result, shared = flight.do(url, lambda: session.get(url))
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Runs fn once for all concurrent callers of the key.
+
+        Returns:
+            The result, and whether this caller shared the result of another.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.followers += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            if call.followers:
+                logger.debug("Shared one call with %d followers | %s", call.followers, key)
+            call.done.set()
+        return call.result, False
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Measures the time TextCleaner takes to clean a chapter
+
+Usage: python scripts/bench_cleaner.py [chapters] [paragraphs]
+       python scripts/bench_cleaner.py --corpus [scale]
+
+With --corpus, the chapters of scripts/cleaner_corpus are used instead, each
+repeated `scale` times in one body, and paragraph extraction is timed apart.
+"""
+import random
+import sys
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+workdir = Path(__file__).parent.parent.absolute()
+sys.path.insert(0, str(workdir))
+
+try:
+    from lncrawl.core.cleaner import TextCleaner
+except ImportError:
+    raise
+
+corpus_dir = workdir / "scripts" / "cleaner_corpus"
+
+WORDS = "the of and to in he she was it that with as his her had for on at by not but".split()
+
+
+def make_chapter(rng: random.Random, paragraphs: int) -> str:
+    parts = ['<div class="chapter-content">']
+    for i in range(paragraphs):
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 60)))
+        if i % 7 == 0:
+            parts.append(f'<p style="color:red;font-weight:bold" class="x">{text}<br/><br/>{text}</p>')
+        elif i % 11 == 0:
+            parts.append(f'<div class="ads"><script>var x = 1;</script>{text}</div>')
+        elif i % 13 == 0:
+            parts.append(f'<div align="center"><span>{text}</span><a href="https://patreon.com/x">Patreon</a></div>')
+        else:
+            parts.append(f"<p><span>{text}</span> <em>{text[:30]}</em>​</p>")
+    parts.append("</div>")
+    return "".join(parts)
+
+
+def best_of(func, repeat: int = 7, number: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def bench_corpus(scale: int):
+    print(f"scale: {scale}")
+    for file in sorted(corpus_dir.glob("*.html")):
+        soup = BeautifulSoup(file.read_text(encoding="utf-8"), "lxml")
+        body = soup.select_one("body > *")
+        html = f"<div>{body.decode_contents() * scale}</div>"
+
+        cleaner = TextCleaner()
+        total = best_of(lambda: cleaner.extract_contents(BeautifulSoup(html, "lxml").div))
+        parse = best_of(lambda: BeautifulSoup(html, "lxml"))
+
+        div = BeautifulSoup(html, "lxml").div
+        cleaner.clean_contents(div)
+        extract = best_of(lambda: cleaner.extract_paragraphs(div))
+
+        print(
+            f"{file.stem:>16}: clean {1000 * (total - parse):8.3f} ms, "
+            f"extract paragraphs {1000 * extract:8.3f} ms"
+        )
+
+
+def main():
+    if sys.argv[1:2] == ["--corpus"]:
+        bench_corpus(int(sys.argv[2]) if len(sys.argv) > 2 else 1)
+        return
+
+    chapters = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    paragraphs = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+
+    rng = random.Random(42)
+    htmls = [make_chapter(rng, paragraphs) for _ in range(chapters)]
+
+    cleaner = TextCleaner()
+    cleaner.bad_css.update({'div[align="center"]'})
+    cleaner.bad_tag_text_pairs.update({"p": ["Translator:", r"Read more at \w+"]})
+    cleaner.bad_text_regex.update({"Support us on Patreon"})
+
+    parse_time = 0.0
+    clean_time = 0.0
+    for html in htmls:
+        start = time.perf_counter()
+        soup = BeautifulSoup(html, "lxml")
+        parse_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        cleaner.extract_contents(soup.body)
+        clean_time += time.perf_counter() - start
+
+    print(f"chapters: {chapters}, paragraphs: {paragraphs}")
+    print(f"parse: {1000 * parse_time / chapters:.3f} ms/chapter")
+    print(f"clean: {1000 * clean_time / chapters:.3f} ms/chapter")
+
+
+if __name__ == "__main__":
+    main()
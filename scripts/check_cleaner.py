@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Checks the output of TextCleaner against the chapters in scripts/cleaner_corpus
+
+Each `<name>.html` holds a chapter body in the shape of a common site template,
+and `<name>.expected` the contents extracted from it by the default cleaner.
+
+Usage: python scripts/check_cleaner.py [--update]
+"""
+import difflib
+import sys
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+workdir = Path(__file__).parent.parent.absolute()
+sys.path.insert(0, str(workdir))
+
+try:
+    from lncrawl.core.cleaner import TextCleaner
+except ImportError:
+    raise
+
+corpus_dir = workdir / "scripts" / "cleaner_corpus"
+
+
+def extract(html: str) -> str:
+    soup = BeautifulSoup(html, "lxml")
+    contents = TextCleaner().extract_contents(soup.select_one("body > *"))
+    # a paragraph per line, to keep the differences readable
+    return contents.replace("</p><p>", "</p>\n<p>") + "\n"
+
+
+def main():
+    update = "--update" in sys.argv[1:]
+
+    failed = 0
+    for file in sorted(corpus_dir.glob("*.html")):
+        output = extract(file.read_text(encoding="utf-8"))
+        expected_file = file.with_suffix(".expected")
+        if update:
+            expected_file.write_text(output, encoding="utf-8")
+            print(f"updated: {expected_file.name}")
+            continue
+
+        expected = expected_file.read_text(encoding="utf-8") if expected_file.exists() else ""
+        if output == expected:
+            print(f"ok: {file.name}")
+            continue
+
+        failed += 1
+        print(f"FAILED: {file.name}")
+        sys.stdout.writelines(
+            difflib.unified_diff(
+                expected.splitlines(keepends=True),
+                output.splitlines(keepends=True),
+                fromfile=expected_file.name,
+                tofile="output",
+            )
+        )
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,10 @@ from urllib.parse import urlparse, parse_qs
 from bs4 import BeautifulSoup
 from lncrawl.models import Chapter
 from lncrawl.core.crawler import Crawler
+from lncrawl.core.cassette import get_cassette
+from lncrawl.core.httpcache import get_http_cache
+from lncrawl.utils.circuit import get_circuit, retry_budget
+from lncrawl.utils.hostlimit import host_slot
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +36,11 @@ class FanMTLCrawler(Crawler):
         self.bridge.mount("https://", adapter)
         self.bridge.mount("http://", adapter)
 
+        # record or replay the rendered pages too
+        cassette = get_cassette()
+        if cassette:
+            cassette.mount(self.bridge)
+
         self.cleaner.bad_css.update({'div[align="center"]'})
         self.check_proxy_health()
         logger.info(f"FanMTL Strategy: Robust Proxy ({self.proxy_url})")
@@ -61,19 +70,42 @@ class FanMTLCrawler(Crawler):
             return False
         except: return False
 
-    def fetch_via_render(self, url):
+    def fetch_via_render(self, url, cache=False):
+        http_cache = get_http_cache() if cache else None
+        cached = http_cache.lookup(url) if http_cache else None
+        if cached and http_cache.is_fresh(cached):
+            response = http_cache.to_response(cached)
+            if response:
+                return response.text
+
+        circuit = get_circuit(urlparse(url).hostname)
+
         # [FIX] Increased retries from 3 to 10 for flaky chapters
         for i in range(10):
+            # fail fast while the host is down, or when everyone is retrying
+            if not circuit.allow():
+                logger.warning(f"Circuit open. Skipping {url}")
+                return None
+            if i > 0 and not retry_budget.try_retry():
+                logger.warning(f"Retry budget exhausted. Giving up {url}")
+                return None
+            retry_budget.record_request()
+
             try:
-                resp = self.bridge.post(f"{self.proxy_url}/fetch", json={"url": url}, timeout=45)
+                # the render proxy hits the origin, so hold the origin's slot
+                with host_slot(urlparse(url).hostname):
+                    resp = self.bridge.post(f"{self.proxy_url}/fetch", json={"url": url}, timeout=45)
                 
+                # the bridge failing says nothing about the origin
                 if resp.status_code != 200:
+                    circuit.record_neutral()
                     time.sleep(5)
                     continue
 
                 data = resp.json()
                 
                 if data.get("status") == "blocked":
+                    circuit.record_neutral()
                     if self.trigger_redeploy(): continue 
                     else: return None
 
@@ -81,17 +113,34 @@ class FanMTLCrawler(Crawler):
                     html = data.get("html")
                     # [FIX] Validation: Ensure content is not empty
                     if html and len(html) > 500:
+                        circuit.record_success()
+                        if http_cache:
+                            http_cache.put(
+                                url,
+                                html.encode("utf-8"),
+                                headers={"Content-Type": "text/html; charset=utf-8"},
+                                encoding="utf-8",
+                            )
                         return html
                     else:
+                        circuit.record_neutral()
                         logger.warning(f"Empty HTML received. Retrying {i}...")
+                else:
+                    # the bridge reached the origin, but could not load the page
+                    circuit.record_failure()
+                    logger.warning(f"Render failed ({data.get('status')}). Retrying {i}...")
+                    time.sleep(2 * (i + 1)) # Backoff
 
             except Exception as e:
+                # bridge connection errors, or a malformed response of the bridge
+                circuit.record_neutral()
+                logger.warning(f"Render bridge error: {e}. Retrying {i}...")
                 time.sleep(2 * (i + 1)) # Backoff
         return None
 
     def read_novel_info(self):
         logger.debug("Visiting %s", self.novel_url)
-        html = self.fetch_via_render(self.novel_url)
+        html = self.fetch_via_render(self.novel_url, cache=True)
         if not html: raise Exception("Failed to load novel info")
 
         soup = self.make_soup(html)
@@ -118,7 +167,7 @@ class FanMTLCrawler(Crawler):
                 
                 for page in range(0, page_count + 1):
                     url = f"{common_url}?page={page}&wjm={wjm}"
-                    html = self.fetch_via_render(url)
+                    html = self.fetch_via_render(url, cache=True)
                     if html: self.parse_chapter_list(self.make_soup(html))
             except Exception as e:
                 logger.error(f"Pagination failed: {e}")
@@ -149,6 +198,5 @@ class FanMTLCrawler(Crawler):
     def download_chapter_body(self, chapter):
         html = self.fetch_via_render(chapter["url"])
         if not html: return ""
-        soup = self.make_soup(html)
-        body = soup.select_one("#chapter-article .chapter-content")
+        body = self.make_region(html, "#chapter-article .chapter-content")
         return self.cleaner.extract_contents(body).strip() if body else ""
@@ -4,8 +4,12 @@ import time
 import requests
 from urllib.parse import urlparse, parse_qs 
 from bs4 import BeautifulSoup
+from lncrawl import constants as C
 from lncrawl.models import Chapter
 from lncrawl.core.crawler import Crawler
+from lncrawl.cloudscraper.clearance import get_clearance_store
+from lncrawl.core.exeptions import is_host_failure
+from lncrawl.utils.circuit import get_circuit, retry_budget
 
 # Import Selenium (Already in your requirements)
 from lncrawl.webdriver.local import create_local
@@ -50,8 +54,37 @@ class WuxiaBoxCrawler(Crawler):
         self.cleaner.bad_css.update({'div[align="center"]'})
         logger.info("WuxiaBox Strategy: Selenium Solver -> Requests Runner (Stable)")
 
+    def load_stored_clearance(self, host):
+        """Reuses a clearance solved by another worker, if it is not the one that just failed."""
+        store = get_clearance_store(C.CLEARANCE_STORE_FILE)
+        entry = store.get(host) if store else None
+        if not entry:
+            return False
+
+        ua, cookies = entry
+        current = self.runner.cookies.get('cf_clearance')
+        if any(c['name'] == 'cf_clearance' and c['value'] == current for c in cookies):
+            store.invalidate(host, current)
+            return False
+
+        for cookie in cookies:
+            self.runner.cookies.set(
+                cookie['name'],
+                cookie['value'],
+                domain=cookie.get('domain', ''),
+                path=cookie.get('path', '/')
+            )
+        self.runner.headers['User-Agent'] = ua
+        self.cookies_synced = True
+        logger.info("✅ Reusing stored clearance. Resuming Turbo Mode.")
+        return True
+
     def refresh_cookies(self, url):
         """Launches a REAL headless Chrome browser to solve the Cloudflare Challenge."""
+        host = urlparse(url).hostname
+        if self.load_stored_clearance(host):
+            return
+
         logger.warning(f"🔒 Launching Browser Solver for: {url}")
         driver = None
         try:
@@ -88,6 +121,19 @@ class WuxiaBoxCrawler(Crawler):
             if found_cf:
                 logger.info("✅ Solver Success! Cookies synced. Resuming Turbo Mode.")
                 self.cookies_synced = True
+
+                store = get_clearance_store(C.CLEARANCE_STORE_FILE)
+                if store and ua:
+                    store.put(host, ua, [
+                        {
+                            'name': cookie['name'],
+                            'value': cookie['value'],
+                            'domain': cookie.get('domain', ''),
+                            'path': cookie.get('path', '/'),
+                            'expires': cookie.get('expiry'),
+                        }
+                        for cookie in cookies
+                    ])
             else:
                 logger.warning("⚠️ Browser finished but 'cf_clearance' missing. Might still work if IP is clean.")
             
@@ -99,10 +145,22 @@ class WuxiaBoxCrawler(Crawler):
                 try: driver.quit()
                 except: pass
 
-    def get_soup_safe(self, url, headers=None):
-        """Smart wrapper: Fails fast -> Calls Solver -> Retries"""
+    def get_soup_safe(self, url, headers=None, region=None):
+        """Smart wrapper: Fails fast -> Calls Solver -> Retries
+
+        With a css selector as region, only that element of the page is parsed,
+        and None is returned if the page could not be fetched.
+        """
+        empty = None if region else self.make_soup("<html></html>")
         retries = 0
+        circuit = get_circuit(urlparse(url).hostname)
         while True:
+            # fail fast while the host is down
+            if not circuit.allow():
+                logger.error(f"Circuit open. Skipping {url}")
+                return empty
+            retry_budget.record_request()
+
             try:
                 req_headers = self.runner.headers.copy()
                 if headers: req_headers.update(headers)
@@ -121,22 +179,29 @@ class WuxiaBoxCrawler(Crawler):
                         raise Exception("Cloudflare Loop (Solver failed)")
 
                 response.raise_for_status()
+                circuit.record_success()
+                if region:
+                    return self.make_region(response, region)
                 return self.make_soup(response)
 
             except Exception as e:
+                if is_host_failure(e):
+                    circuit.record_failure()
+                else:
+                    circuit.record_neutral()
                 msg = str(e).lower()
                 if "404" in msg:
                     logger.error(f"Permanent Error (404): {url}")
-                    return self.make_soup("<html></html>")
+                    return empty
 
-                if retries < 3:
+                if retries < 3 and retry_budget.try_retry():
                     logger.warning(f"Request Error: {e}. Retrying...")
                     time.sleep(3)
                     retries += 1
                     continue
                 
                 logger.error(f"Failed to fetch {url} after retries.")
-                return self.make_soup("<html></html>")
+                return empty
 
     def read_novel_info(self):
         logger.debug("Visiting %s", self.novel_url)
@@ -206,8 +271,7 @@ class WuxiaBoxCrawler(Crawler):
 
     def download_chapter_body(self, chapter):
         try:
-            soup = self.get_soup_safe(chapter["url"])
-            body = soup.select_one("#chapter-article .chapter-content")
+            body = self.get_soup_safe(chapter["url"], region="#chapter-article .chapter-content")
             return self.cleaner.extract_contents(body).strip() if body else ""
         except Exception:
             return ""